@@ -1 +1,27 @@
-from .parser import CVParser
+__version__ = "0.1.0"
+
+# The public classes are imported on first access (PEP 562), so `import cvparser` does not
+# load spaCy, NLTK or the file extractors.
+_LAZY_ATTRIBUTES = {
+    "CVParser": ".parser",
+    "ParserEngine": ".engine",
+    "ResultCache": ".cache",
+    "AsyncParserEngine": ".aio",
+    "DocStore": ".store",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
+
+__all__ = ["CVParser", "ParserEngine", "ResultCache", "AsyncParserEngine", "DocStore"]
@@ -0,0 +1,152 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import mimetypes
+import multiprocessing
+
+from .parser import CVParser
+from .fields import FIELDS, resolve_fields
+from .profiles import PROFILES
+from .workers import init_worker, parse_file
+
+
+PROFILE_HELP = "Pipeline components to load. %s." % "; ".join(
+    "%s degrades %s" % (name, ", ".join(profile.degraded) or "no field") for name, profile in PROFILES.items())
+
+
+def collect_files(inputs: list) -> list:
+    """
+    Expand the command line inputs: directories are walked recursively for supported files,
+    anything else is treated as a file or glob pattern and kept as is, so unsupported or
+    missing files show up as errors in the output.
+    """
+    files = []
+    for value in inputs:
+        if os.path.isdir(value):
+            for root, _, names in os.walk(value):
+                for name in sorted(names):
+                    file_mime, _ = mimetypes.guess_type(name)
+                    if str(file_mime).lower() in CVParser.SUPPORTED_MIMETYPES:
+                        files.append(os.path.join(root, name))
+        else:
+            matches = sorted(glob.glob(value, recursive=True)) or [value]
+            files.extend(path for path in matches if not os.path.isdir(path))
+    return files
+
+
+def run_batch(args) -> int:
+    files = collect_files(args.inputs)
+    fields = resolve_fields(args.fields.split(",")) if args.fields else None
+    engine_kwargs = {"single_pass": args.single_pass, "profile": args.profile}
+
+    out = open(args.out, "w") if args.out != "-" else sys.stdout
+    pool = None
+    started = time.perf_counter()
+    parsed = failed = 0
+    errors = {}
+
+    try:
+        if args.workers > 1:
+            # Every worker loads the models once in its initializer and then streams records back.
+            pool = multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(engine_kwargs,))
+            records = pool.imap_unordered(_parse_job, [(path, fields) for path in files], chunksize=args.chunksize)
+        else:
+            init_worker(engine_kwargs)
+            records = (parse_file(path, fields) for path in files)
+
+        for record in records:
+            if "error" in record:
+                failed += 1
+                errors[record["error"]["type"]] = errors.get(record["error"]["type"], 0) + 1
+            else:
+                parsed += 1
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "files": len(files),
+        "parsed": parsed,
+        "failed": failed,
+        "errors": errors,
+        "workers": args.workers,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(len(files) / elapsed, 3) if elapsed else None,
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if not failed else 1
+
+
+def run_reextract(args) -> int:
+    from .engine import ParserEngine
+    from .store import DocStore
+
+    fields = resolve_fields(args.fields.split(",")) if args.fields else None
+    engine = ParserEngine(single_pass=args.single_pass, profile=args.profile)
+
+    out = open(args.out, "w") if args.out != "-" else sys.stdout
+    started = time.perf_counter()
+    count = 0
+    try:
+        for parser in engine.reextract(DocStore(args.store), fields):
+            out.write(json.dumps({"file": parser.file_path, "result": parser.to_dict()}) + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "documents": count,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(count / elapsed, 3) if elapsed else None,
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+def _parse_job(job):
+    return parse_file(*job)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cvparser")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    batch = commands.add_parser("batch", help="Parse many resumes and write one JSON line per file.")
+    batch.add_argument("inputs", nargs="+", help="Directories, files or glob patterns.")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                       help="Worker processes, each loading the models once (default: CPU count).")
+    batch.add_argument("--out", default="-", help="JSON Lines output file (default: stdout).")
+    batch.add_argument("--fields", default=None,
+                       help="Comma separated fields to extract: %s." % ", ".join(FIELDS))
+    batch.add_argument("--chunksize", type=int, default=1, help="Files handed to a worker at a time.")
+    batch.add_argument("--single-pass", action="store_true", help="Run the custom NER inside the base pipeline.")
+    batch.add_argument("--profile", choices=list(PROFILES), default=None, help=PROFILE_HELP)
+    batch.set_defaults(func=run_batch)
+
+    reextract = commands.add_parser("reextract", help="Rebuild results from the Docs saved in a DocStore.")
+    reextract.add_argument("store", help="DocStore directory.")
+    reextract.add_argument("--out", default="-", help="JSON Lines output file (default: stdout).")
+    reextract.add_argument("--fields", default=None,
+                           help="Comma separated fields to extract: %s." % ", ".join(FIELDS))
+    reextract.add_argument("--single-pass", action="store_true", help="Run the custom NER inside the base pipeline.")
+    reextract.add_argument("--profile", choices=list(PROFILES), default=None, help=PROFILE_HELP)
+    reextract.set_defaults(func=run_reextract)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import os
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .resources import RESOURCES
+from .workers import init_worker, parse_to_dict
+
+
+class AsyncParserEngine:
+    """
+    asyncio front end for `ParserEngine`. File extraction and NLP run on executors so the
+    event loop never blocks, at most `max_concurrency` resumes are in flight (further callers
+    wait for a slot), and every request can carry a timeout.
+
+    With `processes` set, parsing runs in a process pool whose workers each load their own
+    engine; otherwise a thread pool shares the engine given (or loaded by `create`).
+    """
+
+    def __init__(self, engine=None, max_concurrency: int = None, timeout: float = None,
+                 executor=None, extract_executor=None, processes: int = None, engine_kwargs: dict = None):
+        config = RESOURCES['async']
+        self.engine = engine
+        self.timeout = timeout if timeout is not None else config['timeout']
+        self.max_concurrency = max_concurrency or config['max_concurrency']
+        self._semaphore = None
+
+        if processes:
+            self.executor = executor or ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                                                            initargs=(engine_kwargs,))
+        else:
+            self.executor = executor or ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self.extract_executor = extract_executor or ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self.processes = processes
+
+    @classmethod
+    async def create(cls, engine_kwargs: dict = None, **kwargs) -> "AsyncParserEngine":
+        """Load the engine off the event loop, then build the async front end around it."""
+        from .engine import ParserEngine
+
+        instance = cls(engine_kwargs=engine_kwargs, **kwargs)
+        if not instance.processes:
+            loop = asyncio.get_running_loop()
+            instance.engine = await loop.run_in_executor(instance.executor,
+                                                         lambda: ParserEngine(**(engine_kwargs or {})))
+        return instance
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop that is running the requests.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def aparse(self, source, fields: list = None, filename: str = None, timeout: float = None) -> dict:
+        """
+        Parse a file path, or raw file bytes together with a `filename` whose extension tells
+        the file type. Returns the `to_dict()` result. Cancelling the caller, or exceeding
+        `timeout` seconds (including the wait for a slot), returns at once; the work already
+        handed to an executor still finishes in the background, and keeps its slot (and its
+        temporary file) until it does.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        if timeout:
+            return await asyncio.wait_for(self._aparse(source, fields, filename), timeout)
+        return await self._aparse(source, fields, filename)
+
+    async def _aparse(self, source, fields: list, filename: str) -> dict:
+        await self.semaphore.acquire()
+        abandoned = asyncio.Event()
+        job = asyncio.ensure_future(self._run(source, fields, filename, abandoned))
+        # Retrieve the outcome of jobs nobody waits for anymore, so it is not reported as lost.
+        job.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            return await asyncio.shield(job)
+        except asyncio.CancelledError:
+            abandoned.set()
+            raise
+
+    async def _run(self, source, fields: list, filename: str, abandoned: asyncio.Event) -> dict:
+        # Owns the slot taken by `_aparse`. Executor calls cannot be interrupted, so this runs
+        # to the end of the current one even when the caller gave up, skipping the later stages.
+        loop = asyncio.get_running_loop()
+        file_path, temporary = source, False
+        try:
+            if isinstance(source, (bytes, bytearray)):
+                file_path = await loop.run_in_executor(self.extract_executor, _write_temporary, source, filename)
+                temporary = True
+            if abandoned.is_set():
+                return None
+
+            if self.processes:
+                return await loop.run_in_executor(self.executor, parse_to_dict, file_path, fields)
+
+            from .parser import CVParser
+            parser = await loop.run_in_executor(self.extract_executor, CVParser, file_path, self.engine)
+            if abandoned.is_set():
+                return None
+            return await loop.run_in_executor(self.executor, _parse, parser, fields)
+        finally:
+            if temporary:
+                os.remove(file_path)
+            self.semaphore.release()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.extract_executor.shutdown(wait=False)
+
+
+def _write_temporary(content: bytes, filename: str = None) -> str:
+    suffix = os.path.splitext(filename or "")[1]
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(content)
+    return path
+
+
+def _parse(parser, fields: list = None) -> dict:
+    parser.parse(fields)
+    return parser.to_dict()
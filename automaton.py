@@ -0,0 +1,172 @@
+"""
+Aho-Corasick multi-pattern matcher over plain text. Finding every term of a large gazetteer
+costs one pass over the text whatever the number of terms, and needs no spaCy: only the hits
+are aligned to tokens.
+"""
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import deque
+
+from .utils import load_terms
+from .resources import RESOURCES
+
+# Bump whenever the automaton layout or the term normalization changes.
+AUTOMATON_FORMAT_VERSION = 1
+
+
+def lower_text(text: str) -> str:
+    # str.lower() can change the length of a few characters; those are kept as they are so
+    # that offsets in the lowercased text are offsets in `text`.
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class AhoCorasick:
+    """Automaton of lowercased `terms`, matched on word boundaries."""
+
+    def __init__(self, terms):
+        self.terms = []
+        self._goto = [{}]
+        self._fail = [0]
+        # Indexes (into `terms`) of the terms ending at each state, including via fail links.
+        self._output = [()]
+
+        seen = set()
+        for term in terms:
+            term = " ".join(lower_text(str(term)).split())
+            if not term or term in seen:
+                continue
+            seen.add(term)
+            self._add(term, len(self.terms))
+            self.terms.append(term)
+        self._link()
+
+    def _add(self, term: str, index: int):
+        state = 0
+        for char in term:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = following
+        self._output[state] = self._output[state] + (index,)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[following] = target if target != following else 0
+                self._output[following] = self._output[following] + self._output[self._fail[following]]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def find(self, text: str, start: int = 0, end: int = None):
+        """
+        Yield `(start, end, term_index)` for every term found in text[start:end], comparing
+        lowercased, on word boundaries. Overlapping and nested terms are all reported. Word
+        boundaries are those of `text`, so a range cutting a word does not match part of it.
+        """
+        end = len(text) if end is None else end
+        lowered = lower_text(text[start:end])
+        goto, fail, output, terms = self._goto, self._fail, self._output, self.terms
+
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+
+            after = start + position + 1
+            if after < len(text) and text[after].isalnum():
+                continue
+            for index in output[state]:
+                before = after - len(terms[index])
+                if before > 0 and text[before - 1].isalnum():
+                    continue
+                yield before, after, index
+
+
+class TermMatcher:
+    """
+    Gazetteer matcher with the `PhraseMatcher` call signature, backed by an `AhoCorasick`
+    automaton: the text of a Doc or Span is scanned and only the hits that line up with
+    token boundaries are turned into `(match_id, start, end)` token matches.
+    """
+
+    def __init__(self, label: str, automaton: AhoCorasick):
+        self.label = label
+        self.automaton = automaton
+
+    def __len__(self):
+        return len(self.automaton)
+
+    def __call__(self, doclike) -> list:
+        doc = doclike.doc if hasattr(doclike, "doc") else doclike
+        start_char = getattr(doclike, "start_char", 0)
+        end_char = getattr(doclike, "end_char", len(doc.text))
+        match_id = doc.vocab.strings.add(self.label)
+
+        matches = []
+        for start, end, _ in self.automaton.find(doc.text, start_char, end_char):
+            span = doc.char_span(start, end)
+            if span is not None:
+                matches.append((match_id, span.start, span.end))
+        return sorted(matches, key=lambda match: (match[1], match[2]))
+
+
+def _fingerprint(label: str, source: bytes) -> str:
+    digest = hashlib.sha256(source)
+    for part in (label, AUTOMATON_FORMAT_VERSION):
+        digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_automaton(label: str, file_path: str, normalize=str.strip, cache_dir: str = None) -> AhoCorasick:
+    """
+    `AhoCorasick` automaton of the terms in `file_path`, pickled under `cache_dir` and keyed
+    by the file content, so later processes load it instead of building it.
+    """
+    cache_dir = cache_dir or RESOURCES['cache_dir']
+
+    with open(file_path, "rb") as fh:
+        fingerprint = _fingerprint(label, fh.read())
+    cache_path = os.path.join(cache_dir, "%s-%s.automaton" % (label.lower(), fingerprint[:24]))
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as fh:
+                return pickle.load(fh)
+        except Exception:
+            pass
+
+    automaton = AhoCorasick(load_terms(file_path, normalize))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(automaton, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    except OSError:
+        # A read-only cache location only costs us the warm start.
+        pass
+    return automaton
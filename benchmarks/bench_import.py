@@ -0,0 +1,90 @@
+"""
+Import-time benchmark: how long a fresh interpreter takes to import `cvparser` entry points,
+and which heavy dependencies each import drags in.
+
+    python -m cvparser.benchmarks.bench_import --repeat 5 --out import.json
+
+Every measurement runs in a new interpreter, so nothing is served from an already populated
+`sys.modules`. `--importtime` adds the slowest modules reported by `python -X importtime`.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import importlib.util
+
+from .bench_parse import summarize
+
+TARGETS = ("cvparser", "cvparser.utils", "cvparser.parser", "cvparser.__main__", "cvparser.engine")
+
+HEAVY_MODULES = ("spacy", "thinc", "nltk", "pdfminer", "docx2txt", "pandas", "numpy")
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import %s
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _environment() -> dict:
+    # Make the package importable as `cvparser` from the child interpreters.
+    spec = importlib.util.find_spec("cvparser")
+    env = dict(os.environ)
+    if spec and spec.submodule_search_locations:
+        root = os.path.dirname(list(spec.submodule_search_locations)[0])
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure(target: str, env: dict) -> dict:
+    output = subprocess.run([sys.executable, "-c", _PROBE % (target, HEAVY_MODULES)],
+                            env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def importtime(target: str, env: dict, top: int = 15) -> list:
+    """Slowest modules (cumulative microseconds) of `python -X importtime -c "import target"`."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import %s" % target],
+                            env=env, check=True, capture_output=True, text=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+    return [{"module": name, "cumulative_us": us} for us, name in sorted(modules, reverse=True)[:top]]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cvparser.benchmarks.bench_import")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma separated modules to import.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="Add the slowest modules per target.")
+    parser.add_argument("--out", default="-", help="JSON report path (default: stdout).")
+    args = parser.parse_args(argv)
+
+    env = _environment()
+    report = {}
+    for target in args.targets.split(","):
+        runs = [measure(target, env) for _ in range(args.repeat)]
+        report[target] = {
+            "seconds": summarize([run["seconds"] for run in runs]),
+            "loaded": runs[-1]["loaded"],
+        }
+        if args.importtime:
+            report[target]["slowest"] = importtime(target, env)
+
+    output = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(output)
+    else:
+        with open(args.out, "w") as fd:
+            fd.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
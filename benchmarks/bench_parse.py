@@ -0,0 +1,198 @@
+"""
+Throughput and latency benchmark for `CVParser.parse()` and the extractors in `utils.py`.
+
+    python -m cvparser.benchmarks.bench_parse --limit 100 --out bench.json
+    python -m cvparser.benchmarks.bench_parse --baseline previous.json
+
+Writes a JSON report (docs/sec, latency percentiles, peak RSS, per-stage and per-extractor
+times) and, given a baseline report, exits non-zero when a latency or throughput figure
+regresses by more than `--tolerance`.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+
+from .corpus import build_corpus
+
+
+def percentile(values: list, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "total": sum(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values),
+    }
+
+
+def peak_rss() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _timed(timings: dict, name: str, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    timings.setdefault(name, []).append(time.perf_counter() - started)
+    return result
+
+
+def bench_extractors(parser, timings: dict):
+    """Time each extractor of `utils.py` on a document whose Docs are already computed."""
+    from .. import utils, contact
+
+    _timed(timings, "extract_contacts", contact.extract_contacts, parser.file_content)
+    _timed(timings, "extract_email", utils.extract_email, parser.file_content)
+    _timed(timings, "extract_mobile_number", utils.extract_mobile_number, parser.file_content)
+    sections = _timed(timings, "detect_resume_sections", utils.detect_resume_sections, parser)
+    _timed(timings, "extract_entities_wih_custom_model", utils.extract_entities_wih_custom_model, parser.custom_doc)
+    skills = sections.span("skills", parser.doc)
+    if skills is not None:
+        _timed(timings, "extract_skills", utils.extract_skills, parser, skills)
+    education = sections.span("education", parser.doc)
+    if education is not None:
+        _timed(timings, "extract_education", utils.extract_education, parser, education)
+    experience = sections.span("experience", parser.doc, include_heading=True)
+    _timed(timings, "extract_experience", utils.extract_experience, parser, experience)
+    _timed(timings, "extract_opportunity_available", utils.extract_opportunity_available, parser)
+
+
+def run(items: list, engine, fields: list = None, extractors: bool = True, warmup: int = 3) -> dict:
+    from ..parser import CVParser
+
+    for kind, source in items[:warmup]:
+        warm = CVParser(engine=engine, text=source) if kind == "text" else CVParser(source, engine)
+        warm.parse(fields)
+
+    latencies = {}
+    stages = {}
+    stages_cpu = {}
+    extractor_timings = {}
+    started = time.perf_counter()
+    for kind, source in items:
+        begin = time.perf_counter()
+        if kind == "text":
+            parser = CVParser(engine=engine, text=source)
+        else:
+            parser = CVParser(source, engine)
+        parser.parse(fields)
+        latencies.setdefault(kind, []).append(time.perf_counter() - begin)
+        latencies.setdefault("all", []).append(time.perf_counter() - begin)
+
+        for name, timing in parser.timings.to_dict().items():
+            if name == "file_extraction":
+                name = "file_extraction:%s" % kind
+            stages.setdefault(name, []).append(timing["wall"])
+            stages_cpu.setdefault(name, []).append(timing["cpu"])
+
+        if extractors:
+            bench_extractors(parser, extractor_timings)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "documents": len(items),
+        "seconds": elapsed,
+        # `seconds` also covers the extractor timings, so throughput is taken from the latencies.
+        "docs_per_second": len(items) / sum(latencies["all"]) if items else None,
+        "latency": {kind: summarize(values) for kind, values in latencies.items()},
+        "stages": {name: summarize(values) for name, values in stages.items()},
+        "stages_cpu": {name: summarize(values) for name, values in stages_cpu.items()},
+        "extractors": {name: summarize(values) for name, values in extractor_timings.items()},
+        "peak_rss": peak_rss(),
+    }
+
+
+def environment() -> dict:
+    import spacy
+    from .. import __version__
+
+    return {
+        "cvparser": __version__,
+        "spacy": spacy.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Figures that got worse than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for kind, stats in report["latency"].items():
+        for key in ("p50", "p95", "p99"):
+            old = baseline.get("latency", {}).get(kind, {}).get(key)
+            new = stats.get(key)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append("latency.%s.%s: %.4fs -> %.4fs" % (kind, key, old, new))
+    old, new = baseline.get("docs_per_second"), report.get("docs_per_second")
+    if old and new and new < old * (1 - tolerance):
+        regressions.append("docs_per_second: %.2f -> %.2f" % (old, new))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cvparser.benchmarks.bench_parse")
+    parser.add_argument("--limit", type=int, default=50, help="Number of resumes taken from the corpus.")
+    parser.add_argument("--formats", default="text,docx,pdf", help="Comma separated: text, docx, pdf.")
+    parser.add_argument("--fields", default=None, help="Comma separated fields passed to parse().")
+    parser.add_argument("--single-pass", action="store_true")
+    parser.add_argument("--profile", default=None, help="Pipeline profile: fast, balanced or accurate.")
+    parser.add_argument("--no-extractors", action="store_true", help="Skip the per-extractor timings.")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "cvparser-bench-corpus"))
+    parser.add_argument("--out", default="-", help="JSON report path (default: stdout).")
+    parser.add_argument("--baseline", default=None, help="Previous JSON report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression as a fraction.")
+    args = parser.parse_args(argv)
+
+    from ..engine import ParserEngine
+
+    items = build_corpus(args.corpus_dir, limit=args.limit, formats=tuple(args.formats.split(",")))
+
+    load_started = time.perf_counter()
+    engine = ParserEngine(single_pass=args.single_pass, profile=args.profile)
+    load_seconds = time.perf_counter() - load_started
+
+    report = run(items, engine, fields=args.fields.split(",") if args.fields else None,
+                 extractors=not args.no_extractors)
+    report["engine_load_seconds"] = load_seconds
+    report["environment"] = environment()
+    report["options"] = vars(args)
+
+    output = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(output)
+    else:
+        with open(args.out, "w") as fd:
+            fd.write(output)
+
+    if args.baseline:
+        with open(args.baseline) as fd:
+            regressions = compare(report, json.load(fd), args.tolerance)
+        for line in regressions:
+            print("REGRESSION %s" % line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
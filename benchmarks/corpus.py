@@ -0,0 +1,148 @@
+"""
+Benchmark corpus built from the Dataturks resumes bundled with the repository, plus DOCX
+and PDF renderings of the same texts so file extraction is measured too.
+"""
+import os
+import json
+import zipfile
+import hashlib
+from xml.sax.saxutils import escape
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORPUS_FILES = [
+    os.path.join(BASE_DIR, "traindata.json"),
+    os.path.join(BASE_DIR, "traindata1.json"),
+    os.path.join(BASE_DIR, "train", "train.json"),
+]
+
+
+def _read_texts(path: str):
+    with open(path, "r") as fd:
+        head = fd.read(1)
+        fd.seek(0)
+        if head == "[":
+            # spaCy training format: [[text, {"entities": [...]}], ...]
+            for text, _ in json.load(fd):
+                yield text
+        else:
+            # Dataturks export: one JSON record per line.
+            for line in fd:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)["content"]
+
+
+def load_texts(limit: int = None, files: list = None) -> list:
+    """Unique resume texts from the bundled corpora, in file order."""
+    texts = []
+    seen = set()
+    for path in files or CORPUS_FILES:
+        if not os.path.exists(path):
+            continue
+        for text in _read_texts(path):
+            key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            if key in seen or not text.strip():
+                continue
+            seen.add(key)
+            texts.append(text)
+            if limit and len(texts) >= limit:
+                return texts
+    return texts
+
+
+def write_docx(text: str, path: str):
+    """Minimal WordprocessingML document with one paragraph per line."""
+    paragraphs = "".join(
+        '<w:p><w:r><w:t xml:space="preserve">%s</w:t></w:r></w:p>' % escape(line)
+        for line in text.split("\n")
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        '<w:body>%s</w:body></w:document>' % paragraphs
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    relationships = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="word/document.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("_rels/.rels", relationships)
+        archive.writestr("word/document.xml", document)
+
+
+def _pdf_string(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(text: str, path: str, lines_per_page: int = 60, line_width: int = 95):
+    """Minimal PDF with the text set in Helvetica, wrapped and paginated."""
+    lines = []
+    for line in text.split("\n"):
+        while len(line) > line_width:
+            lines.append(line[:line_width])
+            line = line[line_width:]
+        lines.append(line)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [None, None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join("(%s) '" % _pdf_string(line) for line in page) + " ET"
+        objects.append("<< /Length %d >>\nstream\n%s\nendstream" % (len(stream.encode("latin-1")), stream))
+        objects.append("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join("%d 0 R" % i for i in page_ids), len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += ("%d 0 obj\n%s\nendobj\n" % (number, body)).encode("latin-1")
+    xref = len(output)
+    output += ("xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)).encode("latin-1")
+    for offset in offsets:
+        output += ("%010d 00000 n \n" % offset).encode("latin-1")
+    output += ("trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)).encode("latin-1")
+
+    with open(path, "wb") as fh:
+        fh.write(bytes(output))
+
+
+def build_corpus(directory: str, limit: int = None, formats: tuple = ("text", "docx", "pdf")) -> list:
+    """
+    Materialize the corpus. Returns (format, source) pairs where source is the text itself
+    for the "text" format and a file path otherwise.
+    """
+    os.makedirs(directory, exist_ok=True)
+    items = []
+    for index, text in enumerate(load_texts(limit)):
+        if "text" in formats:
+            items.append(("text", text))
+        if "docx" in formats:
+            path = os.path.join(directory, "resume-%04d.docx" % index)
+            if not os.path.exists(path):
+                write_docx(text, path)
+            items.append(("docx", path))
+        if "pdf" in formats:
+            path = os.path.join(directory, "resume-%04d.pdf" % index)
+            if not os.path.exists(path):
+                write_pdf(text, path)
+            items.append(("pdf", path))
+    return items
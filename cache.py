@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from .fields import resolve_fields
+from .resources import RESOURCES
+
+
+def engine_fingerprint(engine) -> str:
+    """
+    Hash of everything besides the input file that shapes a result: the parser version,
+    both models, the pipeline layout and the gazetteer files.
+    """
+    from . import __version__
+
+    digest = hashlib.sha256(__version__.encode("utf-8"))
+    for meta in (engine.nlp.meta, engine.custom_nlp.meta):
+        digest.update(("%s-%s" % (meta.get("name"), meta.get("version"))).encode("utf-8"))
+    digest.update(",".join(engine.nlp.pipe_names).encode("utf-8"))
+    digest.update(",".join(engine.custom_nlp.pipe_names).encode("utf-8"))
+
+    for path in (os.path.join(engine.custom_model_path, "meta.json"), RESOURCES['skills_file'],
+                 RESOURCES['schools_file'], RESOURCES['courses_file']):
+        with open(path, "rb") as fh:
+            digest.update(hashlib.sha256(fh.read()).digest())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent store of `CVParser.to_dict()` results keyed by the file content and the
+    engine fingerprint. Entries live in SQLite and the least recently used ones are evicted
+    once the stored results exceed `max_bytes`.
+
+    Every process opens its own connection, so a cache created before forking (e.g. for a
+    `PreforkPool`) keeps working in the children. The stored size is tracked as results are
+    written and only summed up again, to take other writers into account, once it runs
+    over `max_bytes`.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        config = RESOURCES['result_cache']
+        self.path = path or config['path']
+        self.max_bytes = config['max_bytes'] if max_bytes is None else max_bytes
+        self.fingerprint = None
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._pid = None
+        self._connection = None
+        self._connect()
+
+    def _connect(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._total = self._stored_size()
+
+    def _stored_size(self) -> int:
+        total, = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        return total
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Forked: the parent's connection must not be used (or closed) from here.
+            self._connect()
+        return self._connection
+
+    def bind(self, engine):
+        self.fingerprint = engine_fingerprint(engine)
+        return self
+
+    def key(self, content: bytes, fields: list = None) -> str:
+        digest = hashlib.sha256(content)
+        digest.update(str(self.fingerprint).encode("utf-8"))
+        digest.update(",".join(resolve_fields(fields)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        connection = self.connection
+        with self._lock:
+            row = connection.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key: str, data: dict):
+        value = json.dumps(data)
+        connection = self.connection
+        with self._lock:
+            replaced = connection.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO results (key, data, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._total += len(value) - (replaced[0] if replaced else 0)
+            self._evict()
+
+    def _evict(self):
+        if not self.max_bytes or self._total <= self.max_bytes:
+            return
+        total = self._total = self._stored_size()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT key, size FROM results ORDER BY accessed").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM results WHERE key = ?", stale)
+        self._total = total
+
+    def clear(self):
+        connection = self.connection
+        with self._lock:
+            connection.execute("DELETE FROM results")
+            self._total = 0
+
+    def close(self):
+        if self._pid == os.getpid():
+            self._connection.close()
@@ -0,0 +1,124 @@
+"""
+NLP over very long resumes in bounded memory: the text is cut into sentence-aligned windows
+that overlap, the windows go through `nlp.pipe`, and the Docs are stitched back together
+with the entities put back at document offsets.
+"""
+import re
+
+from .resources import RESOURCES
+
+# Ends of sentences and the bullets resumes use in place of them.
+_BOUNDARY_RE = re.compile(r"(?<=[.!?;:])\s+|\s+(?=[•●▪■◦])")
+
+
+def _last_boundary(text: str, lower: int, upper: int) -> int:
+    """Last sentence boundary in text[lower:upper], else the last space, else `upper`."""
+    boundary = None
+    for match in _BOUNDARY_RE.finditer(text, lower, upper):
+        if match.end() < upper:
+            boundary = match.end()
+    if boundary is None:
+        space = text.rfind(" ", lower, upper)
+        boundary = space + 1 if space >= lower else upper
+    return boundary
+
+
+def _first_boundary(text: str, lower: int, upper: int) -> int:
+    """First sentence boundary in text[lower:upper], else the first space, else `lower`."""
+    match = _BOUNDARY_RE.search(text, lower, upper)
+    if match is not None and match.end() < upper:
+        return match.end()
+    space = text.find(" ", lower, upper)
+    return space + 1 if space >= 0 else lower
+
+
+def split_text(text: str, max_chars: int, overlap: int = 0) -> list:
+    """
+    `(start, end)` windows of at most `max_chars` characters covering `text`, ending on
+    sentence boundaries where possible. Each window starts up to `overlap` characters before
+    the end of the previous one.
+    """
+    overlap = min(overlap, max_chars // 4)
+    windows = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = _last_boundary(text, start + max_chars // 2, start + max_chars)
+        windows.append((start, end))
+        start = max(start + 1, _first_boundary(text, end - overlap, end) if overlap else end)
+    windows.append((start, len(text)))
+    return windows
+
+
+def ownership(text: str, windows: list) -> list:
+    """
+    `(start, end)` ranges that split `text` between the windows: each overlap is cut in
+    the middle, at the start of a token, so every token and entity has exactly one owner.
+    """
+    cuts = []
+    for (_, end), (next_start, _) in zip(windows, windows[1:]):
+        middle = (next_start + end) // 2
+        space = text.find(" ", middle, end)
+        cuts.append(space + 1 if space >= 0 else next_start)
+    return list(zip([0] + cuts, cuts + [len(text)]))
+
+
+def _owned_spans(spans, offset: int, owned: tuple) -> list:
+    return [(offset + span.start_char, offset + span.end_char, span.label_) for span in spans
+            if owned[0] <= offset + span.start_char < owned[1]]
+
+
+def merge(text: str, windows: list, docs):
+    """
+    Stitch the Docs of `windows` into one Doc of `text`. Tokens come from the window owning
+    them; entities (and the custom entities of a single pass pipeline) from the window
+    owning their first character, so an entity cut by one window is taken whole from the
+    other. Raises ValueError if the windows cannot be put back together into `text`.
+    """
+    from spacy.tokens import Doc
+    from spacy.util import filter_spans
+    from .pipeline import CUSTOM_ENTS_KEY
+
+    parts, ents, custom_ents = [], [], None
+    covered = 0
+    for (offset, _), owned, doc in zip(windows, ownership(text, windows), docs):
+        # A token the previous window ran past its cut with is not repeated from this one.
+        tokens = [token.i for token in doc if max(owned[0], covered) <= offset + token.idx < owned[1]]
+        if tokens:
+            parts.append(doc[tokens[0]:tokens[-1] + 1].as_doc())
+            last = doc[tokens[-1]]
+            covered = offset + last.idx + len(last.text_with_ws)
+        ents.extend(_owned_spans(doc.ents, offset, owned))
+        if CUSTOM_ENTS_KEY in doc.spans:
+            custom_ents = (custom_ents or []) + _owned_spans(doc.spans[CUSTOM_ENTS_KEY], offset, owned)
+
+    merged = Doc.from_docs(parts)
+    if merged.text != text:
+        raise ValueError("The windows of a %d characters text do not merge back into it." % len(text))
+
+    def spans(entities):
+        found = [merged.char_span(start, end, label=label, alignment_mode="expand") for start, end, label in entities]
+        return filter_spans([span for span in found if span is not None])
+
+    merged.ents = spans(ents)
+    if custom_ents is not None:
+        merged.spans[CUSTOM_ENTS_KEY] = spans(custom_ents)
+    return merged
+
+
+def process(nlp, text: str, disable: list = None, max_chars: int = None, overlap: int = None):
+    """
+    `nlp(text)` for texts up to `max_chars` characters; longer ones are processed in
+    overlapping windows with `nlp.pipe` and merged. Defaults come from `RESOURCES["chunking"]`.
+    """
+    config = RESOURCES['chunking']
+    max_chars = config['max_chunk_chars'] if max_chars is None else max_chars
+    overlap = config['overlap_chars'] if overlap is None else overlap
+    disable = list(disable or [])
+
+    if not max_chars or len(text) <= max_chars:
+        return nlp(text, disable=disable)
+
+    windows = split_text(text, max_chars, overlap)
+    docs = nlp.pipe((text[start:end] for start, end in windows), disable=disable,
+                    batch_size=config['batch_size'])
+    return merge(text, windows, docs)
@@ -0,0 +1,89 @@
+"""
+Contact details found with plain regular expressions: emails, phone numbers, profile URLs
+and date ranges. Nothing here needs spaCy, so the scanner can be used on its own.
+"""
+import re
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .resources import RESOURCES
+
+
+MONTH = r'(' + RESOURCES['patterns']['MONTHS_SHORT'] + r'|' + RESOURCES['patterns']['MONTHS_LONG']\
+        + r'|0[1-9]|1[0-2]' + r')'
+
+DATE_SEP = r"[-/\s\S]{0,2}"
+
+DATE_PATTERN = r'(' + MONTH + DATE_SEP + RESOURCES['patterns']['YEAR'] \
+               + r'|' + RESOURCES['patterns']['YEAR'] + DATE_SEP + MONTH\
+               + r'|' + RESOURCES['patterns']['DAY'] + DATE_SEP + MONTH + DATE_SEP + RESOURCES['patterns']['YEAR'] \
+               + r'|' + MONTH + RESOURCES['patterns']['DAY'] + RESOURCES['patterns']['YEAR']\
+               + r'|' + RESOURCES["patterns"]['YEAR'] + r')'
+
+
+DATE_RANGE_PATTERN = r"(" + DATE_PATTERN + r"[-\s\S]{0,8}" + DATE_PATTERN + r"|" + DATE_PATTERN + r")"
+
+DATE_RANGE_RE = re.compile(DATE_RANGE_PATTERN)
+
+EMAIL_PATTERN = r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+
+URL_PATTERN = r"(?i:https?://|www\.|(?:linkedin|github|gitlab|twitter|medium|stackoverflow)\.com/)" \
+              r"[^\s<>\"'()]+"
+
+# An optional country code ("+44" or "(+44)") and area code, then 2 to 5 groups of digits.
+# The lookaheads keep dates to the date pattern, which is tried next at the same position: a
+# number may not start with a year followed by a separator ("2015 - 2018", "2016-17",
+# "2018 9876543210") or be a day month year ("20 12 2019"), and its run of digits must hold
+# 7 to 15 of them.
+PHONE_DIGITS = (7, 15)
+
+PHONE_PATTERN = r"(?<![\w+])" \
+                r"(?!(?:19|20)\d{2}(?:[\s./–-]|$))" \
+                r"(?!\d{1,2}[\s./-]\d{1,2}[\s./-](?:19|20)\d{2}(?!\d))" \
+                r"(?=(?:[\s().+-]{0,2}\d){%d,%d}(?![\s().-]{0,2}\d))" % PHONE_DIGITS + \
+                r"(?:\+\d{1,3}[\s.-]?|\(\+\d{1,3}\)\s*)?(?:\(\d{1,4}\)[\s.-]?)?\d{2,4}(?:[\s.-]?\d{2,4}){1,4}(?!\w)"
+
+# Alternatives are tried in this order at every position, so a URL is not read as an email
+# and a phone number is not read as a date.
+CONTACT_RE = re.compile("|".join("(?P<%s>%s)" % (kind, pattern) for kind, pattern in (
+    ("email", EMAIL_PATTERN),
+    ("url", URL_PATTERN),
+    ("phone", PHONE_PATTERN),
+    ("date_range", DATE_RANGE_PATTERN),
+)))
+
+CONTACT_KINDS = ("email", "phone", "url", "date_range")
+
+
+class ContactMatch(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+
+def scan(text: str):
+    """Yield the `ContactMatch`es of `text`, with character offsets, in a single pass."""
+    for match in CONTACT_RE.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        value = match.group(kind)
+
+        if kind == "url":
+            stripped = value.rstrip(".,;:")
+            end -= len(value) - len(stripped)
+            value = stripped
+        yield ContactMatch(kind, value, start, end)
+
+
+def extract_contacts(text: str, contacts: OrderedDict = None) -> OrderedDict:
+    """
+    Distinct values of every kind, in order of appearance. Passing the `contacts` of the
+    previous pieces of a text (e.g. its pages) adds the values of this piece to them.
+    """
+    if contacts is None:
+        contacts = OrderedDict((kind, []) for kind in CONTACT_KINDS)
+    for match in scan(text):
+        if match.text not in contacts[match.kind]:
+            contacts[match.kind].append(match.text)
+    return contacts
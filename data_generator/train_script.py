@@ -5,11 +5,15 @@
 #           Outputs the Spacy training data which can be used for Spacy training.
 #
 ############################################################################################################
+import os
 import json
 import random
 import logging
 import string
 import re
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 # from sklearn.metrics import classification_report
 # from sklearn.metrics import precision_recall_fscore_support
@@ -27,59 +31,48 @@ def trim_entity_spans(data: list) -> list:
     Returns:
         list: The cleaned data.
     """
-    invalid_span_tokens = re.compile(r'\s')
-
     cleaned_data = []
     for text, annotations in data:
-        entities = annotations['entities']
-        valid_entities = []
-        for start, end, label in entities:
-            valid_start = start
-            valid_end = end
-
-            while valid_start < len(text) and invalid_span_tokens.match(
-                    text[valid_start]):
-                valid_start += 1
-            while valid_end > 1 and invalid_span_tokens.match(
-                    text[valid_end - 1]):
-                valid_end -= 1
-                print('end:', valid_end)
-            valid_entities.append([valid_start, valid_end, label])
+        valid_entities = [[*trim_span(text, start, end), label] for start, end, label in annotations['entities']]
         cleaned_data.append([text, {'entities': valid_entities}])
 
     return cleaned_data
 
 
-def convert_dataturks_to_spacy(dataturks_JSON_FilePath):
-    try:
-        training_data = []
-        lines = []
-
-        with open(dataturks_JSON_FilePath, 'r') as f:
-            lines = f.readlines()
-
-        for line in lines:
+def trim_span(text: str, start: int, end: int) -> tuple:
+    """`(start, end)` without the white space at either end of `text[start:end]`."""
+    span = text[start:end]
+    start += len(span) - len(span.lstrip())
+    end -= len(span) - len(span.rstrip())
+    return start, max(start, end)
 
-            data = json.loads(line)
 
-            text = data['content']
+def dataturks_entities(data: dict) -> list:
+    entities = []
+    for annotation in data.get('annotation') or []:
+        #only a single point in text annotation.
+        point = annotation['points'][0]
+        labels = annotation['label']
+        # handle both list of labels or a single label.
+        if not isinstance(labels, list):
+            labels = [labels]
 
-            entities = []
-            for annotation in data['annotation']:
-                #only a single point in text annotation.
-                point = annotation['points'][0]
-                labels = annotation['label']
-                # handle both list of labels or a single label.
-                if not isinstance(labels, list):
-                    labels = [labels]
+        for label in labels:
+            #dataturks indices are both inclusive [start, end] but spacy is not [start, end)
+            entities.append((point['start'], point['end'] + 1, label))
+    return entities
 
-                for label in labels:
-                    #dataturks indices are both inclusive [start, end] but spacy is not [start, end)
-                    entities.append((point['start'], point['end'] + 1, label))
 
+def convert_dataturks_to_spacy(dataturks_JSON_FilePath):
+    try:
+        training_data = []
 
-            # print(entities)
-            training_data.append((text, {"entities": entities}))
+        with open(dataturks_JSON_FilePath, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                training_data.append((data['content'], {"entities": dataturks_entities(data)}))
 
         return training_data
     except Exception as e:
@@ -87,14 +80,126 @@ def convert_dataturks_to_spacy(dataturks_JSON_FilePath):
         return None
 
 
-if __name__ == '__main__':
-    INPUT_FILES = ["traindata.json", "traindata1.json"]
+# Tokenizer of the conversion worker processes, created once by `_init_worker`.
+_nlp = None
+
+
+def _init_worker(lang: str):
+    global _nlp
+    import spacy
+    _nlp = spacy.blank(lang)
+
+
+def convert_records(lines: list, shard_path: str) -> Counter:
+    """
+    Convert Dataturks JSON lines into one `DocBin` shard. Entities are trimmed and aligned
+    to token boundaries with `char_span`; the returned counts say what had to be fixed or
+    dropped.
+    """
+    from spacy.tokens import DocBin
+    from spacy.util import filter_spans
 
-    TRAIN_DATA = []
+    stats = Counter()
+    doc_bin = DocBin()
+    for line in lines:
+        try:
+            data = json.loads(line)
+            text = data['content']
+            entities = dataturks_entities(data)
+        except (ValueError, KeyError, IndexError, TypeError):
+            stats['invalid_records'] += 1
+            continue
+
+        doc = _nlp.make_doc(text)
+        spans = []
+        for start, end, label in entities:
+            stats['entities'] += 1
+            trimmed = trim_span(text, start, end)
+            if trimmed != (start, end):
+                stats['trimmed'] += 1
+            span = doc.char_span(*trimmed, label=label)
+            if span is None:
+                # Boundaries inside a token: keep the tokens fully covered by the annotation.
+                span = doc.char_span(*trimmed, label=label, alignment_mode="contract")
+                stats['misaligned' if span is None else 'realigned'] += 1
+            if span is not None:
+                spans.append(span)
+
+        kept = filter_spans(spans)
+        stats['overlapping'] += len(spans) - len(kept)
+        stats['kept'] += len(kept)
+        stats.update('label:' + span.label_ for span in kept)
+        doc.ents = kept
+        doc_bin.add(doc)
+        stats['records'] += 1
+
+    doc_bin.to_disk(shard_path)
+    stats['shards'] += 1
+    return stats
+
+
+def _read_shards(paths: list, shard_size: int):
+    lines = []
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    lines.append(line)
+                if len(lines) >= shard_size:
+                    yield lines
+                    lines = []
+    if lines:
+        yield lines
+
+
+def convert_dataturks_to_docbins(paths: list, output_dir: str, shard_size: int = 1000, workers: int = None,
+                                 lang: str = "en") -> dict:
+    """
+    Stream Dataturks JSONL exports line by line into `output_dir/train-NNNNN.spacy` shards of
+    `shard_size` records, converted across `workers` processes. At most two shards per
+    worker are in memory at a time. The counts are also written to `output_dir/stats.json`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    stats = Counter()
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lang,)) as executor:
+        for index, lines in enumerate(_read_shards(paths, shard_size)):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.update(future.result())
+            shard_path = os.path.join(output_dir, "train-%05d.spacy" % index)
+            pending.add(executor.submit(convert_records, lines, shard_path))
+        for future in pending:
+            stats.update(future.result())
+
+    report = dict(sorted(stats.items()))
+    with open(os.path.join(output_dir, "stats.json"), "w") as fd:
+        fd.write(json.dumps(report, indent=2))
+    return report
 
-    for file in INPUT_FILES:
-        data = trim_entity_spans(convert_dataturks_to_spacy(file))
-        TRAIN_DATA.extend(data)
 
-    with open("output_train_data.json", "w") as fd:
-        fd.write(json.dumps(TRAIN_DATA))
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", nargs="*", default=["traindata.json", "traindata1.json"],
+                        help="Dataturks JSONL exports.")
+    parser.add_argument("--output-dir", default=None,
+                        help="Write sharded DocBin files and stats.json here instead of output_train_data.json.")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Records per DocBin shard.")
+    parser.add_argument("--workers", type=int, default=None, help="Conversion processes (default: CPU count).")
+    args = parser.parse_args()
+
+    if args.output_dir:
+        print(json.dumps(convert_dataturks_to_docbins(args.inputs, args.output_dir, shard_size=args.shard_size,
+                                                      workers=args.workers), indent=2))
+    else:
+        TRAIN_DATA = []
+
+        for file in args.inputs:
+            data = trim_entity_spans(convert_dataturks_to_spacy(file))
+            TRAIN_DATA.extend(data)
+
+        with open("output_train_data.json", "w") as fd:
+            fd.write(json.dumps(TRAIN_DATA))
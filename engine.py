@@ -0,0 +1,235 @@
+import os
+import threading
+import spacy
+from spacy.matcher import Matcher
+
+from .pipeline import add_custom_ner
+from .sections import SectionDetector
+from .fields import resolve_fields, needs_doc, needs_custom, pipeline_disable
+from .gazetteer import load_gazetteer, build_gazetteer
+from .automaton import TermMatcher, load_automaton
+from .chunking import split_text, merge
+from .profiles import get_profile
+from .workers import error_record
+from .utils import remove_special_chars, normalize_text
+from .resources import RESOURCES
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ParserEngine:
+    """
+    Long-lived owner of everything that is expensive to build: both spaCy pipelines,
+    the token matchers and the gazetteer phrase matchers. Build one per process and
+    reuse it for every document; each parsed document is a lightweight `CVParser`.
+
+    `profile` picks the components loaded in both pipelines ("fast", "balanced" or
+    "accurate", see `cvparser.profiles`); `degraded_fields` tells which fields lose accuracy.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, model: str = "en_core_web_sm", custom_model_path: str = None, single_pass: bool = None,
+                 cache_dir: str = None, cache=None, hooks=(), profile: str = None):
+        self.model = model
+        self.profile = get_profile(profile)
+        self.cache_dir = cache_dir or RESOURCES['cache_dir']
+        # Called as `hook(parser, timing)` for every stage of every parsed document.
+        self.hooks = list(hooks)
+        self.custom_model_path = custom_model_path or os.path.join(BASE_DIR, "train/model")
+        self.single_pass = RESOURCES['single_pass'] if single_pass is None else single_pass
+
+        self.nlp = spacy.load(self.model, exclude=list(self.profile.exclude))
+        if self.single_pass:
+            # One pipeline carrying both NERs, so each text is tokenized and tagged only once.
+            custom_exclude = set(self.profile.custom_exclude) | {"senter", "lemmatizer"}
+            add_custom_ner(self.nlp, spacy.load(self.custom_model_path, exclude=sorted(custom_exclude)))
+            self.custom_nlp = self.nlp
+        else:
+            self.custom_nlp = spacy.load(self.custom_model_path, exclude=list(self.profile.custom_exclude))
+
+        self.matcher = Matcher(self.nlp.vocab)
+        self.matcher.add("USER_NAME", [RESOURCES['patterns']['NAME_PATTERN']])
+        self.custom_matcher = Matcher(self.custom_nlp.vocab)
+
+        self.gazetteers = self._build_gazetteers()
+        self.section_detector = SectionDetector(self.nlp)
+        # Optional `ResultCache`; its key covers the models and gazetteers loaded above.
+        self.cache = cache.bind(self) if cache is not None else None
+
+    def _build_gazetteers(self) -> dict:
+        opportunities = [str(op).strip() for op in RESOURCES['available_opportunities'] if op]
+
+        return {
+            # The skills list is the one expected to grow large: it is matched with an automaton
+            # over the text, so its cost does not grow with the number of skills.
+            "skills": TermMatcher("MATCH_SKILLS", load_automaton(
+                "MATCH_SKILLS", RESOURCES['skills_file'],
+                normalize=lambda skill: remove_special_chars(skill.lower()), cache_dir=self.cache_dir)),
+            "schools": load_gazetteer(self.nlp, "MATCH_SCHOOLS", RESOURCES['schools_file'], cache_dir=self.cache_dir),
+            "courses": load_gazetteer(self.nlp, "MATCH_COURSES", RESOURCES['courses_file'], cache_dir=self.cache_dir),
+            "opportunities": build_gazetteer(self.nlp, "MATCH_AVAILABLE_OPPORTUNITIES", opportunities),
+        }
+
+    def degraded_fields(self, fields: list = None) -> dict:
+        """Fields (of `fields`, all by default) extracted with less information under the profile."""
+        fields = resolve_fields(fields)
+        return {field: reason for field, reason in self.profile.degraded.items() if field in fields}
+
+    @classmethod
+    def default(cls) -> "ParserEngine":
+        """Process-wide engine used by `CVParser` when no engine is passed in."""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def document(self, file_path: str):
+        from .parser import CVParser
+        return CVParser(file_path, engine=self)
+
+    def parse(self, file_path: str, fields: list = None, timings: bool = False, store=None):
+        """
+        Parse one file, going through the result cache when the engine has one. With a
+        `DocStore` as `store` the processed Docs are added to it for `reextract`; the store
+        buffers them, so close it (or call `store.flush()`) after the last parse.
+        """
+        from .parser import CVParser
+
+        key = None
+        if self.cache is not None:
+            with open(file_path, "rb") as fh:
+                key = self.cache.key(fh.read(), fields)
+            data = self.cache.get(key)
+            if data is not None:
+                return CVParser.from_data(self, data, file_path=file_path)
+
+        parser = self.document(file_path)
+        parser.parse(fields, timings=timings)
+        if store is not None:
+            store.add(parser)
+        if key is not None:
+            self.cache.set(key, self._cacheable(parser))
+        return parser
+
+    @staticmethod
+    def _cacheable(parser) -> dict:
+        return {key: value for key, value in parser.to_dict().items() if key != "timings"}
+
+    def parse_many(self, sources, batch_size: int = None, n_process: int = 1, as_text: bool = False,
+                   fields: list = None, store=None):
+        """
+        Parse an iterable of file paths (or already extracted texts when `as_text` is set),
+        streaming them through both pipelines with `nlp.pipe`. Parsed documents are yielded
+        in input order as soon as their batch is done. Pipelines and components that none of
+        `fields` need are skipped. Processed Docs are added to `store` (a `DocStore`), if given;
+        results served by the cache are not.
+
+        A source that cannot be read, extracted or parsed does not stop the batch: its parser
+        holds only an `error` entry (type, message, traceback), like the `batch` command records.
+        """
+        from .parser import CVParser
+
+        batch_size = batch_size or RESOURCES['batch_size']
+        chunking = RESOURCES['chunking']
+        max_chars = chunking['max_chunk_chars']
+        fields = resolve_fields(fields)
+        disable, custom_disable = pipeline_disable(self, fields)
+        use_custom = needs_custom(fields)
+        use_base = needs_doc(fields) or (use_custom and self.single_pass)
+
+        # Every text travels through the pipes with the context
+        # `(file_path, text, key, data, content, window)`, `content` being what the pipes process.
+        def contents():
+            for source in sources:
+                file_path = None if as_text else source
+                try:
+                    key = None
+                    if self.cache is not None:
+                        if as_text:
+                            key = self.cache.key(source.encode("utf-8"), fields)
+                        else:
+                            with open(source, "rb") as fh:
+                                key = self.cache.key(fh.read(), fields)
+                        data = self.cache.get(key)
+                        if data is not None:
+                            # Cached results still travel through the pipes to keep the input order,
+                            # as empty texts that cost nothing to process.
+                            yield "", (file_path, None, key, data, "", None)
+                            continue
+                    text = source if as_text else CVParser.extract_text(source)
+                    content = normalize_text(text)
+                except Exception as e:
+                    # Failures travel the same way, as results that are already known.
+                    yield "", (file_path, None, None, {"error": error_record(e)}, "", None)
+                    continue
+                if max_chars and len(content) > max_chars:
+                    # Too long for one pass: its windows go through the pipes in the same batches
+                    # as the other texts, and are merged once the last one is done.
+                    windows = split_text(content, max_chars, chunking['overlap_chars'])
+                    for index, (start, end) in enumerate(windows):
+                        piece = content[start:end]
+                        yield piece, (file_path, text, key, None, piece, (content, windows, index))
+                    continue
+                yield content, (file_path, text, key, None, content, None)
+
+        if use_base:
+            docs = self.nlp.pipe(contents(), as_tuples=True, batch_size=batch_size, n_process=n_process,
+                                 disable=disable)
+        else:
+            docs = ((None, context) for _, context in contents())
+
+        if self.single_pass or not use_custom:
+            custom_docs = ((doc if use_custom else None, (doc, context)) for doc, context in docs)
+        else:
+            custom_docs = self.custom_nlp.pipe(((context[4], (doc, context)) for doc, context in docs),
+                                               as_tuples=True, batch_size=batch_size, n_process=n_process,
+                                               disable=custom_disable)
+
+        pieces = []
+        for custom_doc, (doc, (file_path, text, key, data, _, window)) in custom_docs:
+            if data is not None:
+                yield CVParser.from_data(self, data, file_path=file_path)
+                continue
+            try:
+                if window is not None:
+                    pieces.append((doc, custom_doc))
+                    content, windows, index = window
+                    if index < len(windows) - 1:
+                        continue
+                    window_docs, window_custom_docs = zip(*pieces)
+                    pieces = []
+                    doc = merge(content, windows, window_docs) if use_base else None
+                    if self.single_pass or not use_custom:
+                        custom_doc = doc if use_custom else None
+                    else:
+                        custom_doc = merge(content, windows, window_custom_docs)
+
+                parser = CVParser.from_docs(self, doc, custom_doc, file_path=file_path, text=text, disable=disable,
+                                            custom_disable=None if self.single_pass else custom_disable)
+                parser.parse(fields)
+            except Exception as e:
+                yield CVParser.from_data(self, {"error": error_record(e)}, file_path=file_path)
+                continue
+            if store is not None:
+                store.add(parser)
+            if key is not None:
+                self.cache.set(key, self._cacheable(parser))
+            yield parser
+
+        if store is not None:
+            store.flush()
+
+    def reextract(self, store, fields: list = None):
+        """
+        Rebuild results from the Docs saved in `store` (a `DocStore`), running only the
+        matcher and regex extraction: neither the files nor the pipelines are processed
+        again, unless `fields` need components that were disabled when the Docs were stored.
+        """
+        from .parser import CVParser
+
+        for doc, custom_doc, file_path, text, disabled in store.load(self.nlp.vocab):
+            parser = CVParser.from_docs(self, doc, custom_doc, file_path=file_path, text=text, disable=disabled)
+            parser.parse(fields)
+            yield parser
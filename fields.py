@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class FieldSpec(NamedTuple):
+    name: str
+    # Base pipeline components the field reads annotations from.
+    components: frozenset = frozenset()
+    # Whether the field needs a tokenized Doc at all.
+    doc: bool = False
+    # Whether the field reads the custom model entities.
+    custom: bool = False
+    # Whether the field is scoped by the detected resume sections.
+    sections: bool = False
+    # Whether the field is read from the contact scan of the raw text.
+    contacts: bool = False
+
+
+FIELDS = OrderedDict((spec.name, spec) for spec in [
+    # The NAME_PATTERN fallback matches on POS, which the attribute ruler maps from the tags.
+    FieldSpec("name", frozenset({"tok2vec", "tagger", "attribute_ruler"}), doc=True, custom=True),
+    FieldSpec("email", contacts=True),
+    FieldSpec("mobile_number", contacts=True),
+    FieldSpec("skills", doc=True, custom=True, sections=True),
+    FieldSpec("education", frozenset({"ner"}), doc=True, custom=True, sections=True),
+    # Proper noun chunks are read from the fine-grained tags.
+    FieldSpec("experience", frozenset({"tok2vec", "tagger"}), doc=True, custom=True, sections=True),
+    FieldSpec("opportunities", doc=True),
+])
+
+
+def resolve_fields(fields=None) -> list:
+    if fields is None:
+        return list(FIELDS)
+
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise ValueError("Unknown fields: %s" % ", ".join(map(str, unknown)))
+    return [field for field in FIELDS if field in fields]
+
+
+def needs_doc(fields: list) -> bool:
+    return any(FIELDS[field].doc or FIELDS[field].sections for field in fields)
+
+
+def needs_custom(fields: list) -> bool:
+    return any(FIELDS[field].custom for field in fields)
+
+
+def needs_contacts(fields: list) -> bool:
+    return any(FIELDS[field].contacts for field in fields)
+
+
+def needs_sections(fields: list) -> bool:
+    return any(FIELDS[field].sections for field in fields)
+
+
+def pipeline_disable(engine, fields: list):
+    """
+    Components to disable in the base and custom pipelines so that only what `fields`
+    read gets computed. Returns a pair of lists of component names.
+    """
+    from .pipeline import SINGLE_PASS_COMPONENTS
+
+    components = set()
+    for field in fields:
+        components |= FIELDS[field].components
+
+    custom = needs_custom(fields)
+    if engine.single_pass:
+        if custom:
+            components |= set(SINGLE_PASS_COMPONENTS)
+        return [name for name in engine.nlp.pipe_names if name not in components], []
+
+    # The custom NER carries its own embedding layer, so nothing else has to run with it.
+    custom_disable = [name for name in engine.custom_nlp.pipe_names if name != "ner"]
+    return [name for name in engine.nlp.pipe_names if name not in components], custom_disable
@@ -0,0 +1,72 @@
+import os
+import hashlib
+import tempfile
+import spacy
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import DocBin
+
+from .utils import load_terms
+from .resources import RESOURCES
+
+# Bump whenever the way terms are normalized or tokenized changes, to invalidate old caches.
+GAZETTEER_FORMAT_VERSION = 1
+
+
+def gazetteer_fingerprint(nlp, label: str, source: bytes) -> str:
+    digest = hashlib.sha256(source)
+    for part in (label, GAZETTEER_FORMAT_VERSION, spacy.__version__,
+                 nlp.meta.get("lang"), nlp.meta.get("name"), nlp.meta.get("version")):
+        digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_gazetteer(nlp, label: str, terms: list, docs: list = None):
+    # Matching on LOWER makes the matcher case-insensitive without enumerating case variants.
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    matcher.add(label, docs if docs is not None else list(nlp.tokenizer.pipe(terms)))
+    return matcher
+
+
+def _write_docs(path: str, docs: list):
+    doc_bin = DocBin(attrs=["ORTH"])
+    for doc in docs:
+        doc_bin.add(doc)
+
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(doc_bin.to_bytes())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_gazetteer(nlp, label: str, file_path: str, normalize=str.strip, cache_dir: str = None):
+    """
+    Return a LOWER-attribute `PhraseMatcher` for the terms in `file_path`. The tokenized
+    patterns are cached as a `DocBin` keyed by the file content and the spaCy/vocab version,
+    so later processes skip tokenization entirely.
+    """
+    cache_dir = cache_dir or RESOURCES['cache_dir']
+
+    with open(file_path, "rb") as fh:
+        fingerprint = gazetteer_fingerprint(nlp, label, fh.read())
+    cache_path = os.path.join(cache_dir, "%s-%s.spacy" % (label.lower(), fingerprint[:24]))
+
+    if os.path.exists(cache_path):
+        try:
+            docs = list(DocBin().from_disk(cache_path).get_docs(nlp.vocab))
+            return build_gazetteer(nlp, label, [], docs=docs)
+        except Exception:
+            pass
+
+    docs = list(nlp.tokenizer.pipe(load_terms(file_path, normalize)))
+    try:
+        _write_docs(cache_path, docs)
+    except OSError:
+        # A read-only cache location only costs us the warm start.
+        pass
+    return build_gazetteer(nlp, label, [], docs=docs)
@@ -1,24 +1,18 @@
-import os, json, re
-import nltk
+import os, io, json, re
 import ssl
 import mimetypes
-import spacy
-from spacy.matcher import Matcher
 from collections import OrderedDict
-from typing import NamedTuple
 
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-from cvparser.utils import (extract_text_from_pdf, extract_text_from_doc, extract_text_from_files, extract_mobile_number,
-                            extract_email, extract_skills, detect_resume_sections, extract_education,
-                            extract_experience_sentences, extract_opportunity_available, extract_entities_wih_custom_model)
+from cvparser.utils import (extract_text_from_pdf, join_pages, extract_text_from_doc, extract_text_from_files, extract_skills,
+                            detect_resume_sections, extract_education, extract_experience, extract_opportunity_available, extract_entities_wih_custom_model,
+                            normalize_text)
 
 from .resources import RESOURCES
+from .contact import extract_contacts
+from .chunking import process
+from .sections import ResumeSection, SectionTable
+from .timings import Timings
+from .fields import resolve_fields, needs_doc, needs_contacts, needs_custom, needs_sections, pipeline_disable
 
 check = lambda key, container: key in container and container[key]
 
@@ -27,37 +21,6 @@ class FileMimeTypeError(Exception):
     pass
 
 
-class ResumeSection(NamedTuple):
-    section_name: str
-    start_index: int
-    end_index: int
-
-    @staticmethod
-    def get_resume_sections(section_name: str, collection: list):
-        sorted_lt = sorted(collection, key=lambda x: x.end_index)
-        index = -1
-        value = None
-        for _index, _value in enumerate(sorted_lt):
-            if str(_value.section_name).lower() == str(section_name).lower():
-                index = _index
-                value = _value
-                break
-        return index, value
-
-    @staticmethod
-    def next_section(previous_index: int, collection: list):
-        sorted_lt = sorted(collection, key=lambda x: x.end_index)
-        index = previous_index + 1
-        if index < len(collection):
-            return index, sorted_lt[index]
-        return -1, None
-
-    @classmethod
-    def get_end_index(cls, index: int, collection: list):
-        _, value = cls.next_section(index, collection)
-        return value.start_index if value else None
-
-
 class CVParser:
     SUPPORTED_MIMETYPES = [
         "application/msword",
@@ -67,138 +30,325 @@ class CVParser:
         "image/png",
     ]
 
-    def __init__(self, file_path: str):
-        self.file_path = file_path
-        self.file_content = self._process_file()
-
-        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-        self.custom_model_path = os.path.join(BASE_DIR, "train/model")
+    def __init__(self, file_path: str = None, engine=None, text: str = None):
+        self._bind(engine, file_path, text)
 
-        self.nlp = spacy.load("en_core_web_sm")
-        self.custom_nlp = spacy.load(self.custom_model_path)
+    @classmethod
+    def from_docs(cls, engine, doc, custom_doc, file_path: str = None, text: str = None, disable: list = None,
+                  custom_disable: list = None):
+        """
+        Build a parser around Docs that were already processed, e.g. by `ParserEngine.parse_many`.
+        `disable` and `custom_disable` list the pipeline components that were not run on `doc`
+        and `custom_doc`.
+        """
+        parser = cls.__new__(cls)
+        parser._bind(engine, file_path, text if text is not None else doc.text)
+        parser._doc = doc
+        parser._custom_doc = custom_doc
+        parser._disabled = list(disable or [])
+        parser._custom_disabled = list(custom_disable or [])
+        return parser
 
-        self.custom_doc = self.custom_nlp(" ".join(self.file_content.split()))
-        self.custom_matcher = Matcher(self.custom_nlp.vocab)
+    @classmethod
+    def from_data(cls, engine, data: dict, file_path: str = None):
+        """Wrap an already extracted result, e.g. one returned by a `ResultCache`."""
+        parser = cls.__new__(cls)
+        parser._bind(engine, file_path, None, extract=False)
+        parser.data.update(data)
+        return parser
+
+    def _bind(self, engine, file_path: str, text: str, extract: bool = True):
+        if engine is None:
+            from .engine import ParserEngine
+            engine = ParserEngine.default()
+
+        if file_path is None and text is None:
+            raise ValueError("Either file_path or text is required.")
+
+        self.engine = engine
+        self.timings = Timings(self, engine.hooks)
+        self.file_path = file_path
+        self._file_content = text
+        self._content = None
+        self._contacts = None
+        if extract:
+            self._file_content = self.file_content
+
+        self.custom_model_path = engine.custom_model_path
+        self.nlp = engine.nlp
+        self.custom_nlp = engine.custom_nlp
+        self.matcher = engine.matcher
+        self.custom_matcher = engine.custom_matcher
 
-        self.matcher = Matcher(self.nlp.vocab)
-        self.doc = self.nlp(" ".join(self.file_content.split()))
-        self.noun_chunks = list(self.doc.noun_chunks)
         self.sections = ['name', 'email', 'mobile_number', 'skills', 'education',
                          'experience', 'opportunities']
         self.data = OrderedDict()
 
+        # The Docs are only computed when a field reads them, with just the components it needs.
+        self._doc = None
+        self._custom_doc = None
+        self._disabled = []
+        self._custom_disabled = []
+
+    @property
+    def file_content(self) -> str:
+        if self._file_content is None:
+            with self.timings.stage("file_extraction"):
+                self._file_content = self._process_file()
+        return self._file_content
+
+    @property
+    def contacts(self):
+        """Emails, phone numbers, URLs and date ranges of the raw text, from a single scan."""
+        if self._contacts is None:
+            file_content = self.file_content
+            with self.timings.stage("contact_scan"):
+                self._contacts = extract_contacts(file_content)
+        return self._contacts
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            file_content = self.file_content
+            with self.timings.stage("normalization"):
+                self._content = normalize_text(file_content)
+        return self._content
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            content = self.content
+            with self.timings.stage("base_nlp") as stage:
+                self._doc = process(self.nlp, content, disable=self._disabled)
+                stage.tokens = len(self._doc)
+        return self._doc
+
+    @property
+    def custom_doc(self):
+        if self._custom_doc is None:
+            if self.engine.single_pass:
+                self._custom_doc = self.doc
+            else:
+                content = self.content
+                with self.timings.stage("custom_nlp") as stage:
+                    self._custom_doc = process(self.custom_nlp, content, disable=self._custom_disabled)
+                    stage.tokens = len(self._custom_doc)
+        return self._custom_doc
+
+    @property
+    def noun_chunks(self):
+        return list(self.doc.noun_chunks) if self.doc.has_annotation("DEP") else []
+
+    def _require(self, fields: list):
+        disable, custom_disable = pipeline_disable(self.engine, fields)
+        if self._doc is None:
+            self._disabled = disable
+        elif not set(self._disabled) <= set(disable):
+            # The Doc is missing components these fields need: run again with both sets.
+            self._doc = None
+            if self.engine.single_pass:
+                self._custom_doc = None
+            self._disabled = [name for name in disable if name in self._disabled]
+        # Otherwise the Doc already has everything: `_disabled` keeps what actually ran.
+
+        if self.engine.single_pass:
+            return
+        if self._custom_doc is None:
+            self._custom_disabled = custom_disable
+        elif not set(self._custom_disabled) <= set(custom_disable):
+            self._custom_doc = None
+            self._custom_disabled = [name for name in custom_disable if name in self._custom_disabled]
+
     def _process_file(self) -> str:
-        if not os.path.exists(self.file_path):
+        if self._file_mime(self.file_path) != "application/pdf":
+            return self.extract_text(self.file_path)
+        try:
+            return self._read_pages(extract_text_from_pdf(self.file_path))
+        except Exception:
+            self._content = self._contacts = None
+            return extract_text_from_files(self.file_path)
+
+    def _read_pages(self, pages) -> str:
+        """
+        Join `pages` as they are extracted, normalizing and scanning each one for contacts
+        on arrival, so both are done once the last page is (and overlap with the extraction
+        when the pages come from a process pool). Contacts never span two pages.
+        """
+        text = io.StringIO()
+        content = []
+        contacts = None
+        for number, page in enumerate(pages):
+            if number:
+                text.write(" ")
+            text.write(page)
+            with self.timings.stage("normalization"):
+                page_content = normalize_text(page)
+                if page_content:
+                    content.append(page_content)
+            with self.timings.stage("contact_scan"):
+                contacts = extract_contacts(page, contacts)
+
+        self._content = " ".join(content)
+        self._contacts = contacts if contacts is not None else extract_contacts("")
+        return text.getvalue()
+
+    @classmethod
+    def _file_mime(cls, file_path: str) -> str:
+        if not os.path.exists(file_path):
             raise FileNotFoundError("File does not exist.")
 
-        file_mime, _ = mimetypes.guess_type(self.file_path)
+        file_mime, _ = mimetypes.guess_type(file_path)
         file_mime = str(file_mime).lower()
 
-        if file_mime not in self.SUPPORTED_MIMETYPES:
+        if file_mime not in cls.SUPPORTED_MIMETYPES:
             raise FileMimeTypeError("Sorry file type not supported.")
+        return file_mime
+
+    @classmethod
+    def extract_text(cls, file_path: str) -> str:
+        """
+        Whole text of `file_path`. Parsers built on a PDF read its pages one by one instead,
+        normalizing and scanning them as they arrive (see `_read_pages`).
+        """
+        file_mime = cls._file_mime(file_path)
 
         try:
             if file_mime == "application/pdf":
-                text = " ".join([page for page in extract_text_from_pdf(self.file_path)])
+                text = join_pages(extract_text_from_pdf(file_path))
             elif file_mime in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                                "application/msword"]:
-                text = extract_text_from_doc(self.file_path)
+                text = extract_text_from_doc(file_path)
             else:
-                text = extract_text_from_files(self.file_path)
+                text = extract_text_from_files(file_path)
         except Exception:
-            text = extract_text_from_files(self.file_path)
+            text = extract_text_from_files(file_path)
         return text
 
     @staticmethod
     def download_nlk_data():
-        nltk.download('maxent_ne_chunker')
-        nltk.download('words')
+        import nltk
+
+        try:
+            _create_unverified_https_context = ssl._create_unverified_context
+        except AttributeError:
+            pass
+        else:
+            ssl._create_default_https_context = _create_unverified_https_context
+
+        # Only the stop word list is still read from NLTK.
         nltk.download('stopwords')
-        nltk.download('punkt')
-        nltk.download('wordnet')
-        nltk.download('averaged_perceptron_tagger')
 
-    def parse(self):
-        check_key = lambda key: check(key, self.data)
+    def parse(self, fields: list = None, timings: bool = False, hooks=()):
+        """
+        Extract `fields` (all of `self.sections` by default). Only the pipeline components and
+        intermediate results those fields depend on are computed; see `cvparser.fields.FIELDS`.
+        With `timings` set the per-stage timings are added to the result, and `hooks` get
+        called with every finished stage on top of the engine hooks.
+        """
+        engine_hooks = self.timings.hooks
+        self.timings.hooks = engine_hooks + list(hooks)
+        try:
+            self._parse(resolve_fields(self.sections if fields is None else fields))
+        finally:
+            self.timings.hooks = engine_hooks
 
-        detected_sections = detect_resume_sections(self)
-        custom_entities = extract_entities_wih_custom_model(self.custom_doc)
+        if timings:
+            self.data['timings'] = self.timings.to_dict()
 
-        for section in self.sections:
+    def _parse(self, fields: list):
+        check_key = lambda key: check(key, self.data)
+        self._require(fields)
+
+        # Inputs shared by several fields are computed up front, in stages of their own rather
+        # than inside the `field:*` stage of whichever field reads them first.
+        if needs_contacts(fields):
+            self.contacts
+        if needs_doc(fields):
+            self.doc
+
+        if needs_sections(fields):
+            doc = self.doc
+            with self.timings.stage("section_detection") as stage:
+                detected_sections = detect_resume_sections(self)
+                stage.tokens = len(doc)
+        else:
+            detected_sections = SectionTable([])
+
+        custom_entities = {}
+        if needs_custom(fields):
+            custom_doc = self.custom_doc
+            with self.timings.stage("custom_entities"):
+                custom_entities = extract_entities_wih_custom_model(custom_doc)
+
+        for section in fields:
             if not check_key(section):
-                index, sect = ResumeSection.get_resume_sections(section, detected_sections)
-
-                if section == "name":
-                    try:
-                        self.data['name'] = custom_entities['Name'][0]
-                    except (IndexError, KeyError):
-                        self.matcher.add("USER_NAME", [RESOURCES['patterns']['NAME_PATTERN']])
-                        matches = self.matcher(self.doc)
-                        for _, start, end in matches:
-                            span = self.doc[start:end]
-                            self.data[section] = span.text
-                            break
-                    try:
-                        self.data['designation'] = custom_entities['Designation']
-                    except KeyError:
-                        pass
-                elif section == "mobile_number":
-                    self.data[section] = extract_mobile_number(self.file_content)[0:2]
-                elif section == "email":
-                    self.data[section] = extract_email(self.file_content)
-
-                elif section == "skills":
-                    if index >= 0:
-                        start_index = sect.end_index
-                        end_index = ResumeSection.get_end_index(index, detected_sections)
-
-                        span = self.doc[start_index:end_index] if end_index else self.doc[start_index:]
-                        self.data[section] = extract_skills(self, span, list(span.noun_chunks))
-                    skill_set = set(section in self.data and self.data[section] or [])
-                    try:
-                        for skill in custom_entities['Skills']:
-                            skill = str(skill).strip().replace("\n", " ")
-                            skill_set.add(skill)
-                        self.data[section] = list(skill_set)
-                    except Exception as e:
-                        pass
-                elif section == "education":
-                    if index >= 0:
-                        start_index = sect.end_index
-                        end_index = ResumeSection.get_end_index(index, detected_sections)
-
-                        span = self.doc[start_index:end_index] if end_index else self.doc[start_index:]
-                        self.data[section] = extract_education(self, span.text)
-
-                    try:
-                        self.data['college_name'] = custom_entities['College Name']
-                    except Exception:
-                        pass
-
-                    try:
-                        self.data['graduation_year'] = custom_entities['Graduation Year']
-                    except:
-                        pass
-
-                    try:
-                        self.data['degree'] = custom_entities['Degree']
-                    except KeyError:
-                        pass
-                elif section == "experience":
-                    experience = dict()
-                    experience['sentences'] = extract_experience_sentences(" ".join(self.file_content.split()))
-
-                    if index >= 0:
-                        pass
-                    try:
-                        experience['companies_worked_at'] = custom_entities['Companies worked at']
-                    except Exception:
-                        pass
-                    self.data[section] = experience
-                elif section == "opportunities":
-                    self.data[section] = extract_opportunity_available(self)
-
-        # print(detected_sections)
+                with self.timings.stage("field:%s" % section):
+                    self._parse_field(section, detected_sections, custom_entities)
+
+    def _parse_field(self, section: str, detected_sections, custom_entities: dict):
+        index, sect = detected_sections.get(section)
+
+        if section == "name":
+            try:
+                self.data['name'] = custom_entities['Name'][0]
+            except (IndexError, KeyError):
+                matches = self.matcher(self.doc) if self.doc.has_annotation("POS") else []
+                for _, start, end in matches:
+                    span = self.doc[start:end]
+                    self.data[section] = span.text
+                    break
+            try:
+                self.data['designation'] = custom_entities['Designation']
+            except KeyError:
+                pass
+        elif section == "mobile_number":
+            self.data[section] = self.contacts["phone"][0:2]
+        elif section == "email":
+            self.data[section] = next(iter(self.contacts["email"]), None)
+
+        elif section == "skills":
+            if index >= 0:
+                span = detected_sections.span(section, self.doc)
+                self.data[section] = extract_skills(self, span)
+            skill_set = set(section in self.data and self.data[section] or [])
+            try:
+                for skill in custom_entities['Skills']:
+                    skill = str(skill).strip().replace("\n", " ")
+                    skill_set.add(skill)
+                self.data[section] = list(skill_set)
+            except Exception as e:
+                pass
+        elif section == "education":
+            if index >= 0:
+                span = detected_sections.span(section, self.doc)
+                self.data[section] = extract_education(self, span)
+
+            try:
+                self.data['college_name'] = custom_entities['College Name']
+            except Exception:
+                pass
+
+            try:
+                self.data['graduation_year'] = custom_entities['Graduation Year']
+            except:
+                pass
+
+            try:
+                self.data['degree'] = custom_entities['Degree']
+            except KeyError:
+                pass
+        elif section == "experience":
+            experience = dict()
+            # The heading is kept: it is often the "experience" the chunks are searched for.
+            span = detected_sections.span(section, self.doc, include_heading=True) if index >= 0 else None
+            experience['sentences'] = extract_experience(self, span)
+            try:
+                experience['companies_worked_at'] = custom_entities['Companies worked at']
+            except Exception:
+                pass
+            self.data[section] = experience
+        elif section == "opportunities":
+            self.data[section] = extract_opportunity_available(self)
 
     def to_dict(self):
         return dict(self.data)
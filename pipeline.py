@@ -0,0 +1,38 @@
+from spacy.language import Language
+
+BASE_ENTS_KEY = "base_ents"
+CUSTOM_ENTS_KEY = "custom_ents"
+
+# Components added to the base pipeline by `add_custom_ner`.
+SINGLE_PASS_COMPONENTS = ("cvparser_stash_entities", "custom_ner", "cvparser_restore_entities")
+
+
+@Language.component("cvparser_stash_entities")
+def stash_entities(doc):
+    # Park the base model's entities and leave the custom NER an unconstrained Doc.
+    doc.spans[BASE_ENTS_KEY] = list(doc.ents)
+    doc.set_ents([], default="missing")
+    return doc
+
+
+@Language.component("cvparser_restore_entities")
+def restore_entities(doc):
+    doc.spans[CUSTOM_ENTS_KEY] = list(doc.ents)
+    doc.ents = list(doc.spans[BASE_ENTS_KEY])
+    return doc
+
+
+def add_custom_ner(nlp, custom_nlp):
+    """
+    Source the `ner` component of the custom model into `nlp` so a single pass yields both
+    entity sets: `doc.ents` keeps the base entities and `doc.spans["custom_ents"]` holds the
+    resume entities.
+    """
+    for label in custom_nlp.get_pipe("ner").labels:
+        nlp.vocab.strings.add(label)
+
+    stash, name, restore = SINGLE_PASS_COMPONENTS
+    nlp.add_pipe(stash, after="ner")
+    nlp.add_pipe("ner", name=name, source=custom_nlp, after=stash)
+    nlp.add_pipe(restore, after=name)
+    return nlp
@@ -0,0 +1,200 @@
+import os
+import gc
+import collections
+import resource
+import multiprocessing
+from multiprocessing.connection import wait
+
+from . import workers as worker_state
+from .workers import parse_file
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_memory(pid: int = None) -> dict:
+    """
+    Resident set size of a process in bytes and, where Linux exposes it, the proportional
+    set size, which splits pages shared copy-on-write between the processes using them.
+    """
+    pid = pid or os.getpid()
+    memory = {}
+    try:
+        with open("/proc/%d/statm" % pid) as fh:
+            memory["rss"] = int(fh.read().split()[1]) * _PAGE_SIZE
+        with open("/proc/%d/smaps_rollup" % pid) as fh:
+            for line in fh:
+                if line.startswith("Pss:"):
+                    memory["pss"] = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        if pid == os.getpid():
+            memory.setdefault("rss", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    return memory
+
+
+def preload_nltk():
+    # NLTK corpora are lazy loaded; touch them so the workers inherit them already loaded.
+    from .utils import english_stopwords
+
+    try:
+        english_stopwords()
+    except LookupError:
+        pass
+
+
+def _worker_loop(connection, max_jobs: int):
+    done = 0
+    while not max_jobs or done < max_jobs:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        job_id, file_path, fields = job
+        record = parse_file(file_path, fields)
+        record["job"] = job_id
+        record["memory"] = process_memory()
+        connection.send(record)
+        done += 1
+    connection.close()
+
+
+class _Worker:
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        self.job = None
+        self.done = 0
+
+
+class PreforkPool:
+    """
+    Pool of forked workers sharing the parent's loaded models copy-on-write. The parent
+    builds the engine, gazetteers and NLTK resources once, then forks `workers` processes
+    and hands them jobs from its queue. A worker exits after `max_jobs_per_worker` documents
+    and is replaced by a fresh fork, which caps memory growth. Needs the `fork` start method.
+    """
+
+    def __init__(self, workers: int = None, max_jobs_per_worker: int = None, engine=None, engine_kwargs: dict = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs_per_worker = max_jobs_per_worker or 0
+
+        if engine is None:
+            from .engine import ParserEngine
+            engine = ParserEngine(**(engine_kwargs or {}))
+        # Installed as the worker engine before forking, so every child inherits it.
+        worker_state._engine = self.engine = engine
+        preload_nltk()
+
+        self._context = multiprocessing.get_context("fork")
+        self._workers = {}
+        self._next_job = 0
+        self.recycled = 0
+
+    def _spawn(self):
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(target=_worker_loop, args=(child_connection, self.max_jobs_per_worker),
+                                        daemon=True)
+        process.start()
+        child_connection.close()
+        self._workers[process.pid] = _Worker(process, parent_connection)
+
+    def _remove(self, worker: _Worker):
+        self._workers.pop(worker.process.pid, None)
+        worker.connection.close()
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+
+    def start(self):
+        # Move everything allocated so far out of the collector's reach, so collections in the
+        # workers do not write to (and un-share) the inherited pages.
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+        while len(self._workers) < self.workers:
+            self._spawn()
+        return self
+
+    def map(self, file_paths, fields: list = None):
+        """
+        Parse `file_paths` and yield their records as they finish (in completion order).
+        Replies to jobs of an earlier `map` that was not consumed to the end are dropped.
+        """
+        if not self._workers:
+            self.start()
+
+        first_job = self._next_job
+        jobs = collections.deque()
+        for file_path in file_paths:
+            jobs.append((self._next_job, file_path, fields))
+            self._next_job += 1
+        pending = len(jobs)
+
+        while pending:
+            for worker in list(self._workers.values()):
+                if worker.job is None and jobs:
+                    worker.job = jobs.popleft()
+                    worker.connection.send(worker.job)
+
+            busy = [worker for worker in self._workers.values() if worker.job is not None]
+            ready = set(wait([worker.connection for worker in busy] + [worker.process.sentinel for worker in busy]))
+
+            for worker in busy:
+                record, dead = None, False
+                if worker.connection in ready:
+                    try:
+                        record = worker.connection.recv()
+                    except EOFError:
+                        # The worker closed its end: it exited, or is about to.
+                        dead = True
+                if record is not None and record.get("job") != worker.job[0]:
+                    continue
+
+                job_id, file_path, _ = worker.job
+                if record is not None:
+                    worker.job = None
+                    worker.done += 1
+                    if self.max_jobs_per_worker and worker.done >= self.max_jobs_per_worker:
+                        self._remove(worker)
+                        self.recycled += 1
+                        self._spawn()
+                elif dead or worker.process.sentinel in ready or not worker.process.is_alive():
+                    self._remove(worker)
+                    self._spawn()
+                    record = {"file": file_path, "job": job_id, "pid": worker.process.pid,
+                              "error": {"type": "WorkerDied", "message": "exit code %s" % worker.process.exitcode}}
+                else:
+                    continue
+
+                if job_id < first_job:
+                    # Left over from an abandoned `map`: the worker is free again, nothing to report.
+                    continue
+                pending -= 1
+                yield record
+
+    def stats(self) -> dict:
+        return {
+            "parent": process_memory(),
+            "workers": {pid: process_memory(pid) for pid in self._workers},
+            "recycled": self.recycled,
+        }
+
+    def close(self):
+        for worker in list(self._workers.values()):
+            try:
+                worker.connection.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in list(self._workers.values()):
+            self._remove(worker)
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,49 @@
+from typing import NamedTuple
+
+from .resources import RESOURCES
+
+
+class Profile(NamedTuple):
+    name: str
+    # Components left out when loading the base (`nlp`) and the custom pipeline.
+    exclude: tuple
+    custom_exclude: tuple
+    # Fields extracted with less information under this profile, and why.
+    degraded: dict
+
+
+# The custom NER carries its own embedding layer, so every profile can drop the rest of the
+# custom pipeline: `extract_entities_wih_custom_model` only reads its entities.
+_CUSTOM_EXCLUDE = ("tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer")
+
+PROFILES = {
+    "fast": Profile(
+        "fast",
+        exclude=("tagger", "parser", "senter", "attribute_ruler", "lemmatizer"),
+        custom_exclude=_CUSTOM_EXCLUDE,
+        degraded={
+            "name": "only the custom model's Name entity; no PROPN pattern fallback without POS tags",
+            "experience": "empty sentences: proper noun chunks need the tagger",
+        },
+    ),
+    "balanced": Profile(
+        "balanced",
+        exclude=("parser", "senter", "lemmatizer"),
+        custom_exclude=_CUSTOM_EXCLUDE,
+        degraded={},
+    ),
+    "accurate": Profile(
+        "accurate",
+        exclude=(),
+        custom_exclude=(),
+        degraded={},
+    ),
+}
+
+
+def get_profile(name: str = None) -> Profile:
+    name = name or RESOURCES['profile']
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError("Unknown profile %r, expected one of: %s" % (name, ", ".join(PROFILES)))
@@ -2,11 +2,41 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+CACHE_DIR = os.environ.get("CVPARSER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "cvparser"))
+
 
 RESOURCES = {
     "skills_file": os.path.join(BASE_DIR, "skills.csv"),
     "schools_file": os.path.join(BASE_DIR, "schools.csv"),
     "courses_file": os.path.join(BASE_DIR, "courses.csv"),
+    "cache_dir": CACHE_DIR,
+    "batch_size": 32,
+    "result_cache": {
+        "path": os.path.join(CACHE_DIR, "results.sqlite3"),
+        "max_bytes": 256 * 1024 * 1024,
+    },
+    "single_pass": False,
+    # Pipeline profile: "fast", "balanced" or "accurate" (see cvparser.profiles).
+    "profile": "accurate",
+    "education_date_window": 30,
+    # Texts longer than `max_chunk_chars` go through the pipelines in windows overlapping by
+    # `overlap_chars`, `batch_size` windows at a time.
+    "chunking": {
+        "max_chunk_chars": 50000,
+        "overlap_chars": 2000,
+        "batch_size": 4,
+    },
+    "async": {
+        "max_concurrency": 4,
+        "timeout": None,
+    },
+    "pdf": {
+        "max_pages": None,
+        # Far beyond any resume; only bounds the text of pathological documents.
+        "max_bytes": 16 * 1024 * 1024,
+        "workers": 1,
+        "parallel_min_pages": 8,
+    },
     "available_opportunities": ["full time", "part time", "temporary", "contract",
                                 "internship", "seasonal", "co founder", "freelance", "per diem",
                                 "reserve"
@@ -24,6 +54,6 @@ RESOURCES = {
     "resume_sections": {
         "skills": ["SKILLS", "PROFESSIONAL SKILLS", "TECH SKILLS", "TECHNICAL SKILLS"],
         "education": ["EDUCATION", "SCHOOL", "SCHOOLS"],
-        "experience": ["EXPERIENCES", "CAREER", "EXPERIENCE"]
+        "experience": ["EXPERIENCES", "CAREER", "EXPERIENCE", "PROFESSIONAL EXPERIENCE"]
     }
 }
@@ -1,6 +1,3 @@
-from nltk.corpus import stopwords
-
-
 # Education (Upper Case Mandatory)
 EDUCATION   = ['BE','B.E.', 'B.E', 'BS', 'B.S', 'ME', 'M.E', 'M.E.', 'MS',
                'M.S', 'BTECH', 'MTECH', 'SSC', 'HSC', 'CBSE', 'ICSE', 'X', 'XII']
@@ -12,8 +9,6 @@ MONTHS_LONG = r'(january)|(february)|(march)|(april)|(may)|(june)|(july)|(august
 
 YEAR = r'(((20|19)(\d{2})))'
 
-STOPWORDS = set(stopwords.words('english'))
-
 RESUME_SECTIONS = [
                     'accomplishments',
                     'experience',
@@ -419,3 +414,11 @@ MEASURABLE_RESULTS = {
         'created'
     ]
 }
+
+
+def __getattr__(name):
+    # The NLTK stopwords are only loaded when `STOPWORDS` is first used.
+    if name == "STOPWORDS":
+        from ..utils import english_stopwords
+        return english_stopwords()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
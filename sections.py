@@ -0,0 +1,103 @@
+from typing import NamedTuple
+
+from .resources import RESOURCES
+from .resources.patterns import RESUME_SECTIONS
+
+
+class ResumeSection(NamedTuple):
+    section_name: str
+    start_index: int
+    end_index: int
+
+    @staticmethod
+    def get_resume_sections(section_name: str, collection: list):
+        sorted_lt = sorted(collection, key=lambda x: x.end_index)
+        index = -1
+        value = None
+        for _index, _value in enumerate(sorted_lt):
+            if str(_value.section_name).lower() == str(section_name).lower():
+                index = _index
+                value = _value
+                break
+        return index, value
+
+    @staticmethod
+    def next_section(previous_index: int, collection: list):
+        sorted_lt = sorted(collection, key=lambda x: x.end_index)
+        index = previous_index + 1
+        if index < len(collection):
+            return index, sorted_lt[index]
+        return -1, None
+
+    @classmethod
+    def get_end_index(cls, index: int, collection: list):
+        _, value = cls.next_section(index, collection)
+        return value.start_index if value else None
+
+
+def section_headings() -> dict:
+    """Headings per section: the configured `resume_sections` plus the `RESUME_SECTIONS` list."""
+    headings = {name: list(texts) for name, texts in RESOURCES['resume_sections'].items()}
+    for heading in RESUME_SECTIONS:
+        name = next((name for name, texts in headings.items() if heading.upper() in texts), heading)
+        texts = headings.setdefault(name, [])
+        if heading.upper() not in texts:
+            texts.append(heading.upper())
+    return headings
+
+
+class SectionTable:
+    """Detected sections ordered by position, with constant time lookup by section name."""
+
+    def __init__(self, sections: list):
+        self.sections = sorted(sections, key=lambda x: x.start_index)
+        self._index = {str(section.section_name).lower(): index for index, section in enumerate(self.sections)}
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __repr__(self):
+        return "SectionTable(%r)" % self.sections
+
+    def get(self, section_name: str):
+        index = self._index.get(str(section_name).lower(), -1)
+        return index, self.sections[index] if index >= 0 else None
+
+    def get_end_index(self, index: int):
+        if 0 <= index < len(self.sections) - 1:
+            return self.sections[index + 1].start_index
+        return None
+
+    def span(self, section_name: str, doc, include_heading: bool = False):
+        """Span of `doc` covered by the section, from its heading up to the next heading."""
+        index, section = self.get(section_name)
+        if section is None:
+            return None
+        start_index = section.start_index if include_heading else section.end_index
+        end_index = self.get_end_index(index)
+        return doc[start_index:end_index] if end_index is not None else doc[start_index:]
+
+
+class SectionDetector:
+    """Matches every known section heading in a single scan of the Doc."""
+
+    def __init__(self, nlp, headings: dict = None):
+        from spacy.matcher import PhraseMatcher
+
+        self.headings = headings or section_headings()
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for section_name, texts in self.headings.items():
+            self.matcher.add(section_name, list(nlp.tokenizer.pipe(texts)))
+        self.vocab = nlp.vocab
+
+    def __call__(self, doc) -> SectionTable:
+        sections = {}
+        for match_id, start, end in sorted(self.matcher(doc), key=lambda x: (x[1], -x[2])):
+            section_name = self.vocab.strings[match_id]
+            # Like before, the first occurrence of a heading marks the section.
+            if section_name not in sections:
+                sections[section_name] = ResumeSection(section_name=section_name, start_index=start, end_index=end)
+        return SectionTable(list(sections.values()))
@@ -0,0 +1,103 @@
+import os
+import glob
+import time
+import uuid
+import tempfile
+
+from .resources import RESOURCES
+
+STORE_FORMAT_VERSION = 1
+
+# Key of the stored fields in `Doc.user_data`.
+USER_DATA_KEY = "cvparser"
+
+
+class DocStore:
+    """
+    Directory of processed resumes, written as one `DocBin` shard per `batch_size` documents.
+    Every Doc keeps the raw extracted text, the file path, the components that did not run
+    and the custom model entities (as character offsets) in its `user_data`, so results can be
+    rebuilt with `ParserEngine.reextract` after changing the gazetteers or extraction rules,
+    without extracting the files or running the pipelines again.
+
+    Shards are named by write time and a random id, so any number of stores and processes can
+    fill one directory without overwriting each other. Documents are buffered until a shard is
+    full: call `flush` or `close` (or use the store as a context manager) once done adding.
+    """
+
+    def __init__(self, path: str, batch_size: int = None):
+        self.path = path
+        self.batch_size = batch_size or RESOURCES['batch_size']
+        self._pending = []
+        os.makedirs(path, exist_ok=True)
+
+    def add(self, parser):
+        """Queue the Docs of a parsed `CVParser`; a shard is written every `batch_size` documents."""
+        from .pipeline import CUSTOM_ENTS_KEY
+
+        doc, custom_doc = parser.doc, parser.custom_doc
+        if CUSTOM_ENTS_KEY in custom_doc.spans:
+            custom_ents = custom_doc.spans[CUSTOM_ENTS_KEY]
+        else:
+            custom_ents = custom_doc.ents
+        doc.user_data[USER_DATA_KEY] = {
+            "version": STORE_FORMAT_VERSION,
+            "file_path": parser.file_path,
+            "text": parser.file_content,
+            "disabled": list(parser._disabled),
+            "custom_ents": [(ent.start_char, ent.end_char, ent.label_) for ent in custom_ents],
+        }
+        self._pending.append(doc)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        from spacy.tokens import DocBin
+
+        if not self._pending:
+            return
+        doc_bin = DocBin(store_user_data=True, docs=self._pending)
+        name = "docs-%020d-%s.spacy" % (time.time_ns(), uuid.uuid4().hex)
+        # Written next to the store and renamed, so readers never see a partial shard.
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(doc_bin.to_bytes())
+            os.replace(temporary, os.path.join(self.path, name))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self._pending = []
+
+    def shards(self) -> list:
+        return sorted(glob.glob(os.path.join(self.path, "docs-*.spacy")))
+
+    def load(self, vocab):
+        """
+        Yield `(doc, custom_doc, file_path, text, disabled)` for every stored document. The
+        custom model entities are restored as a span group of `doc`, which also serves as
+        `custom_doc`, the way a single pass pipeline returns them.
+        """
+        from spacy.tokens import DocBin
+        from .pipeline import CUSTOM_ENTS_KEY
+
+        for shard in self.shards():
+            doc_bin = DocBin(store_user_data=True).from_disk(shard)
+            for doc in doc_bin.get_docs(vocab):
+                stored = doc.user_data.get(USER_DATA_KEY, {})
+                if stored.get("version") != STORE_FORMAT_VERSION:
+                    raise ValueError("%s was written by an unsupported version of DocStore." % shard)
+
+                spans = [doc.char_span(start, end, label=label, alignment_mode="expand")
+                         for start, end, label in stored["custom_ents"]]
+                doc.spans[CUSTOM_ENTS_KEY] = [span for span in spans if span is not None]
+                yield doc, doc, stored["file_path"], stored["text"], list(stored["disabled"])
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
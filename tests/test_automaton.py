@@ -0,0 +1,50 @@
+import pytest
+
+from ..automaton import AhoCorasick, load_automaton
+
+
+def found(automaton, text, start=0, end=None):
+    return [(text[begin:stop], automaton.terms[index]) for begin, stop, index in automaton.find(text, start, end)]
+
+
+def test_terms_match_on_word_boundaries_only():
+    automaton = AhoCorasick(["java", "c"])
+    assert found(automaton, "Java, JavaScript and C.") == [("Java", "java"), ("C", "c")]
+    assert found(automaton, "javajava cc abc") == []
+
+
+@pytest.mark.parametrize("text, matched", [("python", "python"), ("Python!", "Python"), ("(PYTHON)", "PYTHON"),
+                                           ("use python", "python"), ("python3", None), ("cpython", None)])
+def test_terms_match_at_text_edges_and_punctuation(text, matched):
+    assert found(AhoCorasick(["python"]), text) == ([(matched, "python")] if matched else [])
+
+
+def test_overlapping_and_nested_terms_are_all_reported():
+    automaton = AhoCorasick(["machine learning", "learning", "deep learning", "machine"])
+    assert sorted(found(automaton, "Machine learning")) == [
+        ("Machine", "machine"), ("Machine learning", "machine learning"), ("learning", "learning")]
+
+
+def test_duplicate_and_spaced_terms_are_normalized():
+    automaton = AhoCorasick(["SQL", "sql ", "  machine   learning"])
+    assert automaton.terms == ["sql", "machine learning"]
+
+
+def test_offsets_are_relative_to_the_whole_text():
+    automaton = AhoCorasick(["go"])
+    text = "go to go"
+    assert [(begin, stop) for begin, stop, _ in automaton.find(text, 3)] == [(6, 8)]
+    # A range cutting a word does not turn part of it into a match.
+    assert list(automaton.find("gopher", 0, 2)) == []
+    assert list(automaton.find("ergo", 2)) == []
+
+
+def test_automaton_is_loaded_from_the_cache(tmp_path):
+    terms = tmp_path / "skills.csv"
+    terms.write_text("Python\nDocker\n")
+    cache_dir = tmp_path / "cache"
+
+    built = load_automaton("SKILLS", str(terms), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 1
+    loaded = load_automaton("SKILLS", str(terms), cache_dir=str(cache_dir))
+    assert loaded.terms == built.terms == ["python", "docker"]
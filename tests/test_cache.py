@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from ..cache import ResultCache
+from ..fields import FIELDS
+
+
+def test_default_fields_share_the_key_of_every_field(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    assert cache.key(b"cv", None) == cache.key(b"cv", list(reversed(FIELDS)))
+    assert cache.key(b"cv", ["name"]) != cache.key(b"cv", None)
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_bytes=100)
+    for index in range(4):
+        cache.set(str(index), {"value": "x" * 10})
+    cache.get("0")
+    cache.set("4", {"value": "x" * 10})
+
+    assert cache._total == cache._stored_size() <= 100
+    assert cache.get("0") is not None
+    assert cache.get("1") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_children_open_their_own_connection(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    pid = os.fork()
+    if pid == 0:
+        try:
+            cache.set("child", {"value": 1})
+            cache.close()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert cache.get("child") == {"value": 1}
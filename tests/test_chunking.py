@@ -0,0 +1,54 @@
+import pytest
+
+from ..chunking import split_text, ownership, merge
+
+TEXT = " ".join("Sentence number %d of the resume." % index for index in range(40))
+
+
+@pytest.mark.parametrize("overlap", [0, 20])
+def test_windows_cover_the_text(overlap):
+    windows = split_text(TEXT, 200, overlap)
+    assert windows[0][0] == 0 and windows[-1][1] == len(TEXT)
+    assert all(end - start <= 200 for start, end in windows)
+    for (_, end), (next_start, _) in zip(windows, windows[1:]):
+        assert end - overlap <= next_start <= end
+
+
+def test_windows_end_on_sentence_boundaries():
+    for start, end in split_text(TEXT, 200, 20)[:-1]:
+        assert TEXT[:end].endswith(". ")
+
+
+def test_short_text_is_one_window():
+    assert split_text("Short text.", 200, 20) == [(0, 11)]
+
+
+def test_ownership_splits_the_text_at_token_starts():
+    windows = split_text(TEXT, 200, 20)
+    owned = ownership(TEXT, windows)
+    assert owned[0][0] == 0 and owned[-1][1] == len(TEXT)
+    for (_, end), (start, _) in zip(owned, owned[1:]):
+        assert end == start and TEXT[start - 1] == " "
+    for (window_start, window_end), (start, end) in zip(windows, owned):
+        assert window_start <= start and end <= window_end
+
+
+def test_merge_rebuilds_the_text_with_entities_taken_whole():
+    spacy = pytest.importorskip("spacy")
+    nlp = spacy.blank("en")
+    text = TEXT + " Worked at Acme Corporation Limited for years."
+    windows = split_text(text, 200, 40)
+
+    docs = []
+    for start, end in windows:
+        doc = nlp(text[start:end])
+        position = text.find("Acme Corporation Limited")
+        ent = doc.char_span(position - start, position - start + 24, label="ORG") \
+            if start <= position and position + 24 <= end else None
+        doc.ents = [ent] if ent is not None else []
+        docs.append(doc)
+
+    merged = merge(text, windows, docs)
+    assert merged.text == text
+    assert [(ent.text, ent.label_) for ent in merged.ents] == [("Acme Corporation Limited", "ORG")]
+    assert [token.text for token in merged] == [token.text for token in nlp(text)]
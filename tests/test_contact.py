@@ -0,0 +1,45 @@
+import pytest
+
+from ..contact import scan, extract_contacts
+
+
+def kinds(text):
+    return [(match.kind, match.text) for match in scan(text)]
+
+
+@pytest.mark.parametrize("text", ["Graduated 2016", "2016-17", "2015 - Present", "Class of 2019.",
+                                  "2015 2018", "2010 2014", "20 12 2019"])
+def test_years_are_dates_not_phones(text):
+    found = kinds(text)
+    assert found and all(kind == "date_range" for kind, _ in found)
+
+
+def test_year_before_phone_is_not_merged():
+    assert kinds("2018 9876543210") == [("date_range", "2018"), ("phone", "9876543210")]
+
+
+@pytest.mark.parametrize("text", ["555-123-4567", "+233 20 123 4567", "(555) 123-4567", "+1 (555) 222 3333",
+                                  "0540241385", "(+44) 20 7946 0958", "(+233)540241385"])
+def test_phone_numbers(text):
+    assert kinds("call " + text + " today") == [("phone", text)]
+
+
+def test_phone_digit_bounds():
+    assert kinds("123456789012345678") == []
+    assert kinds("ext 12 34") == []
+
+
+def test_offsets_and_kinds():
+    text = "a.b+cv@mail.example.com | https://www.linkedin.com/in/jdoe, jan 2015 - dec 2018"
+    matches = list(scan(text))
+    assert [match.kind for match in matches] == ["email", "url", "date_range"]
+    for match in matches:
+        assert text[match.start:match.end] == match.text
+    assert matches[1].text == "https://www.linkedin.com/in/jdoe"
+
+
+def test_extract_contacts_dedupes_in_order():
+    contacts = extract_contacts("x@y.io 555-123-4567 x@y.io 555-123-4567 github.com/jdoe")
+    assert contacts["email"] == ["x@y.io"]
+    assert contacts["phone"] == ["555-123-4567"]
+    assert contacts["url"] == ["github.com/jdoe"]
@@ -0,0 +1,48 @@
+import os
+import json
+import importlib
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+pytest.importorskip("tqdm")
+
+from spacy.training import Example
+
+TRAIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "train")
+
+TEXTS = [
+    ("Jane Smith worked at Acme.", [(0, 10, "Name")]),
+    ("John Doe studied at KNUST.", [(0, 8, "Name")]),
+    ("Ama Mensah is a software engineer.", [(0, 10, "Name")]),
+]
+
+
+@pytest.fixture
+def manual_training(monkeypatch):
+    # The training scripts are run from their directory and import each other as top-level modules.
+    monkeypatch.syspath_prepend(TRAIN_DIR)
+    return importlib.import_module("manual_training")
+
+
+def examples(nlp):
+    return [Example.from_dict(nlp.make_doc(text), {"entities": ents}) for text, ents in TEXTS]
+
+
+def test_checkpoints_are_written_to_a_fresh_directory_and_resumed(manual_training, tmp_path):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("ner")
+    nlp.initialize(lambda: examples(nlp))
+    checkpoint_dir = str(tmp_path / "run" / "checkpoints")
+
+    manual_training.train(nlp, examples(nlp), examples(nlp), max_epochs=1, checkpoint_dir=checkpoint_dir)
+    assert os.path.exists(os.path.join(checkpoint_dir, "best", "meta.json"))
+
+    last = os.path.join(checkpoint_dir, "last")
+    nlp, optimizer, state, best_weights = manual_training.load_checkpoint(last)
+    assert state["epoch"] == 0 and best_weights is not None
+
+    manual_training.train(nlp, examples(nlp), examples(nlp), max_epochs=2, checkpoint_dir=checkpoint_dir,
+                          resume=(optimizer, state, best_weights))
+    with open(os.path.join(last, "state.json")) as fd:
+        assert json.loads(fd.read())["epoch"] == 1
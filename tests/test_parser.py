@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+# parser.py imports its helpers through the installed `cvparser` package.
+parser_module = pytest.importorskip("cvparser.parser")
+CVParser = parser_module.CVParser
+
+
+def processed_parser(single_pass, disabled, custom_disabled):
+    engine = SimpleNamespace(single_pass=single_pass, hooks=[], custom_model_path=None, nlp=None,
+                             custom_nlp=None, matcher=None, custom_matcher=None)
+    return CVParser.from_docs(engine, "doc", "custom doc", text="", disable=disabled,
+                              custom_disable=custom_disabled)
+
+
+@pytest.fixture
+def requires(monkeypatch):
+    def set_required(disable, custom_disable):
+        monkeypatch.setattr(parser_module, "pipeline_disable", lambda engine, fields: (disable, custom_disable))
+    return set_required
+
+
+def test_docs_with_every_component_are_kept(requires):
+    parser = processed_parser(False, ["parser"], ["tagger"])
+    requires(["parser", "lemmatizer"], ["tagger", "parser"])
+    parser._require([])
+    assert (parser._doc, parser._custom_doc) == ("doc", "custom doc")
+    assert (parser._disabled, parser._custom_disabled) == (["parser"], ["tagger"])
+
+
+def test_docs_missing_components_are_reprocessed(requires):
+    parser = processed_parser(False, ["parser", "lemmatizer"], ["tagger", "parser"])
+    requires(["lemmatizer"], ["parser"])
+    parser._require([])
+    assert (parser._doc, parser._custom_doc) == (None, None)
+    assert (parser._disabled, parser._custom_disabled) == (["lemmatizer"], ["parser"])
+
+
+def test_single_pass_custom_doc_follows_the_doc(requires):
+    parser = processed_parser(True, ["parser"], None)
+    requires([], [])
+    parser._require([])
+    assert (parser._doc, parser._custom_doc, parser._disabled) == (None, None, [])
+
+
+def test_pdf_pages_are_normalized_and_scanned_as_they_arrive():
+    from cvparser.contact import extract_contacts
+    from cvparser.utils import normalize_text
+
+    pages = ["Jane  Smith\njane@example.com ", "", "\t+233 54 024 1385\n2016 - 2018  "]
+    parser = processed_parser(False, [], [])
+    text = parser._read_pages(iter(pages))
+
+    assert text == " ".join(pages)
+    assert parser._content == normalize_text(text)
+    assert parser._contacts == extract_contacts(text)
+    assert [timing.stage for timing in parser.timings.stages].count("contact_scan") == 3
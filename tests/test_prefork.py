@@ -0,0 +1,38 @@
+import os
+import time
+
+import pytest
+
+from .. import prefork
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+
+def fake_parse_file(file_path, fields):
+    if file_path == "crash":
+        os._exit(3)
+    time.sleep(0.3 if file_path == "slow" else 0.02)
+    return {"file": file_path}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(prefork, "parse_file", fake_parse_file)
+    monkeypatch.setattr(prefork, "preload_nltk", lambda: None)
+    with prefork.PreforkPool(workers=2, max_jobs_per_worker=2, engine=object()) as pool:
+        yield pool
+
+
+def test_abandoned_map_does_not_leak_into_the_next(pool):
+    records = pool.map(["slow", "a", "b"])
+    assert next(records)["file"] == "a"
+    records.close()
+
+    assert sorted(record["file"] for record in pool.map(["c", "d", "e"])) == ["c", "d", "e"]
+
+
+def test_crashed_worker_is_reported_and_replaced(pool):
+    records = {record["file"]: record for record in pool.map(["a", "crash", "b"])}
+    assert sorted(records) == ["a", "b", "crash"]
+    assert records["crash"]["error"]["type"] == "WorkerDied"
+    assert len(pool.stats()["workers"]) == 2
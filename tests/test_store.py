@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from ..store import DocStore
+
+
+def stored_parser(nlp, text, file_path):
+    doc = nlp(text)
+    doc.ents = [doc.char_span(0, 10, label="Name")]
+    return SimpleNamespace(doc=doc, custom_doc=doc, file_path=file_path, file_content="  " + text,
+                           _disabled=["parser"])
+
+
+def test_round_trip(tmp_path):
+    nlp = spacy.blank("en")
+    with DocStore(str(tmp_path), batch_size=2) as store:
+        for index in range(3):
+            store.add(stored_parser(nlp, "Jane Smith worked at Acme %d" % index, "cv-%d.pdf" % index))
+
+    loaded = list(DocStore(str(tmp_path)).load(nlp.vocab))
+    assert [item[2] for item in loaded] == ["cv-0.pdf", "cv-1.pdf", "cv-2.pdf"]
+    doc, custom_doc, _, text, disabled = loaded[0]
+    assert doc.text == "Jane Smith worked at Acme 0"
+    assert text == "  Jane Smith worked at Acme 0"
+    assert disabled == ["parser"]
+    assert [(span.text, span.label_) for span in custom_doc.spans["custom_ents"]] == [("Jane Smith", "Name")]
+
+
+def test_stores_sharing_a_directory_keep_every_shard(tmp_path):
+    nlp = spacy.blank("en")
+    for index in range(2):
+        store = DocStore(str(tmp_path))
+        store.add(stored_parser(nlp, "Jane Smith worked at Acme %d" % index, "cv-%d.pdf" % index))
+        store.close()
+
+    assert len(DocStore(str(tmp_path)).shards()) == 2
+    assert len(list(DocStore(str(tmp_path)).load(nlp.vocab))) == 2
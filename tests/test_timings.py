@@ -0,0 +1,26 @@
+import time
+
+from ..timings import Timings
+
+
+def test_nested_stages_are_not_counted_twice():
+    reported = []
+    timings = Timings(hooks=[lambda parser, timing: reported.append(timing.stage)])
+    with timings.stage("field:email"):
+        time.sleep(0.02)
+        with timings.stage("contact_scan") as stage:
+            stage.tokens = 3
+            time.sleep(0.05)
+
+    result = timings.to_dict()
+    assert reported == ["contact_scan", "field:email"]
+    assert result["contact_scan"]["wall"] >= 0.05 and result["contact_scan"]["tokens"] == 3
+    assert 0.02 <= result["field:email"]["wall"] < 0.05
+
+
+def test_repeated_stages_add_up():
+    timings = Timings()
+    for _ in range(2):
+        with timings.stage("base_nlp"):
+            time.sleep(0.01)
+    assert timings.to_dict()["base_nlp"]["wall"] >= 0.02
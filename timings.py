@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import NamedTuple
+
+
+class StageTiming(NamedTuple):
+    stage: str
+    wall: float
+    cpu: float
+    tokens: int = None
+
+
+class _Stage:
+    tokens = None
+
+
+class Timings:
+    """
+    Per-stage wall time, CPU time and token counts of one parsed document. Every finished
+    stage is also passed to the hooks as `hook(parser, timing)`. Times are exclusive: a stage
+    started inside another one is left out of the outer stage's time, so the stages add up
+    to the time actually spent.
+    """
+
+    def __init__(self, parser=None, hooks=()):
+        self.parser = parser
+        self.hooks = list(hooks)
+        self.stages = []
+        # `[wall, cpu]` spent in the nested stages of each stage being timed.
+        self._nested = []
+
+    @contextmanager
+    def stage(self, name: str):
+        stage = _Stage()
+        nested = [0.0, 0.0]
+        self._nested.append(nested)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._nested.pop()
+            if self._nested:
+                self._nested[-1][0] += wall
+                self._nested[-1][1] += cpu
+            timing = StageTiming(name, wall - nested[0], cpu - nested[1], stage.tokens)
+            self.stages.append(timing)
+            for hook in self.hooks:
+                hook(self.parser, timing)
+
+    def to_dict(self) -> OrderedDict:
+        # A stage can run more than once (e.g. the Doc is rebuilt for more fields): add them up.
+        result = OrderedDict()
+        for timing in self.stages:
+            entry = result.setdefault(timing.stage, {"wall": 0.0, "cpu": 0.0, "tokens": None})
+            entry["wall"] += timing.wall
+            entry["cpu"] += timing.cpu
+            if timing.tokens is not None:
+                entry["tokens"] = timing.tokens
+        return result
@@ -1,30 +1,54 @@
-import pandas as pd
 import json
+import random
+import argparse
 from tqdm import tqdm
 import spacy
 from spacy.tokens import DocBin
+from spacy.util import filter_spans
 
-nlp = spacy.blank("en") # load a new spacy model
-db = DocBin() # create a DocBin object
-
-with open("train.json", "r") as fd:
-    TRAIN_DATA = json.loads(fd.read())
-
-
-for text, annot in tqdm(TRAIN_DATA): # data in previous format
-    doc = nlp.make_doc(text) # create doc object from text
-    ents = []
-    print(text, annot)
-    for start, end, label in annot["entities"]: # add character indexes
-        span = doc.char_span(start, end, label=label, alignment_mode="contract")
-        if span is None:
-            print("Skipping entity")
-        else:
-            ents.append(span)
-    try:
-        doc.ents = ents # label the text with the ents
-    except Exception:
-        pass
-    db.add(doc)
-
-db.to_disk("./train.spacy") # save the docbin object
+
+def make_docs(train_data: list, nlp=None):
+    """Yield one annotated Doc per `(text, {"entities": [...]})` pair of `train_data`."""
+    nlp = nlp or spacy.blank("en")  # load a new spacy model
+    for text, annot in tqdm(train_data):  # data in previous format
+        doc = nlp.make_doc(text)  # create doc object from text
+        ents = []
+        for start, end, label in annot["entities"]:  # add character indexes
+            span = doc.char_span(start, end, label=label, alignment_mode="contract")
+            if span is None:
+                print("Skipping entity")
+            else:
+                ents.append(span)
+        # Overlapping annotations are resolved in favour of the longest span.
+        doc.ents = filter_spans(ents)  # label the text with the ents
+        yield doc
+
+
+def convert(input_path: str = "train.json", output_path: str = "train.spacy", dev_path: str = None,
+            eval_split: float = 0.0, seed: int = 0) -> dict:
+    """
+    Convert the JSON training data once to `DocBin` files. With `dev_path` set, a shuffled
+    `eval_split` fraction of the documents is written there as the held-out set.
+    """
+    with open(input_path, "r") as fd:
+        train_data = json.loads(fd.read())
+
+    docs = list(make_docs(train_data))
+    random.Random(seed).shuffle(docs)
+    held_out = int(len(docs) * eval_split) if dev_path else 0
+
+    DocBin(docs=docs[held_out:]).to_disk(output_path)  # save the docbin object
+    if dev_path:
+        DocBin(docs=docs[:held_out]).to_disk(dev_path)
+    return {"train": len(docs) - held_out, "dev": held_out}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default="train.json")
+    parser.add_argument("--output", default="train.spacy")
+    parser.add_argument("--dev", default=None, help="Also write a held-out DocBin here.")
+    parser.add_argument("--eval-split", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(convert(args.input, args.output, dev_path=args.dev, eval_split=args.eval_split, seed=args.seed))
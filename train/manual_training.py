@@ -1,8 +1,18 @@
-import random
 import os
-import spacy
+import glob
 import json
+import time
+import pickle
+import random
+import shutil
+import argparse
+import spacy
+from spacy.tokens import DocBin
 from spacy.training import Example
+from spacy.util import minibatch
+from thinc.api import compounding
+
+from convert_training_data_to_spacy import convert
 
 test_string = """
 Nafiu Shaibu
@@ -73,40 +83,230 @@ Affiliations
 """
 
 
-def main():
-    TRAIN_DATA = json.loads(open("train.json", "r").read())
-    
-    if not os.path.exists("model/meta.json"):
-        nlp = spacy.load('en_core_web_sm')
-    else:
-        nlp = spacy.load("./model")
+def load_examples(nlp, path: str) -> list:
+    # Built once from the DocBin (or a directory of DocBin shards) and reused every epoch.
+    paths = sorted(glob.glob(os.path.join(path, "*.spacy"))) if os.path.isdir(path) else [path]
+    return [Example(nlp.make_doc(doc.text), doc)
+            for path in paths for doc in DocBin().from_disk(path).get_docs(nlp.vocab)]
+
+
+def save_pipeline(nlp, path: str):
+    # Components disabled for training are enabled while saving, or the saved config would
+    # keep them disabled when the pipeline is loaded.
+    disabled = list(nlp.disabled)
+    for name in disabled:
+        nlp.enable_pipe(name)
+    try:
+        nlp.to_disk(path)
+    finally:
+        for name in disabled:
+            nlp.disable_pipe(name)
+
+
+# Optimizer tables keyed by `(node id, parameter name)`.
+OPTIMIZER_TABLES = ("mom1", "mom2", "averages", "nr_update", "last_seen")
+
+
+def _node_keys(nlp) -> dict:
+    """Node id to `(component name, position in model.walk())`, which is stable across processes."""
+    keys = {}
+    for name, component in nlp.pipeline:
+        model = getattr(component, "model", None)
+        if model is None or not hasattr(model, "walk"):
+            continue
+        for position, node in enumerate(model.walk()):
+            keys.setdefault(node.id, (name, position))
+    return keys
+
+
+def optimizer_state(nlp, optimizer) -> dict:
+    """
+    The optimizer tables with node ids replaced by stable keys. Node ids are handed out per
+    process, so the pickled optimizer itself would not line up with a reloaded pipeline.
+    """
+    keys = _node_keys(nlp)
+    state = {}
+    for table in OPTIMIZER_TABLES:
+        values = getattr(optimizer, table, None)
+        if values is not None:
+            state[table] = {keys[node_id] + (param,): value for (node_id, param), value in values.items()
+                            if node_id in keys}
+    return state
+
+
+def restore_optimizer(nlp, state: dict):
+    """
+    A fresh optimizer of `nlp` carrying the tables saved by `optimizer_state`. Its
+    hyperparameters come from the pipeline config; the training loop never steps their
+    schedules, so nothing else needs restoring.
+    """
+    node_ids = {key: node_id for node_id, key in _node_keys(nlp).items()}
+    optimizer = nlp.create_optimizer()
+    for table, values in state.items():
+        current = getattr(optimizer, table, None)
+        if current is None:
+            continue
+        for (name, position, param), value in values.items():
+            node_id = node_ids.get((name, position))
+            if node_id is not None:
+                current[(node_id, param)] = value
+    return optimizer
+
+
+def save_checkpoint(nlp, path: str, optimizer, state: dict, best_weights: bytes = None):
+    """
+    Write the pipeline, the optimizer state and the training state to `path`. The checkpoint
+    is built next to it and swapped in, so an interrupted save leaves the previous one intact.
+    """
+    temporary = path + ".tmp"
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary, exist_ok=True)
+    save_pipeline(nlp, os.path.join(temporary, "model"))
+    with open(os.path.join(temporary, "optimizer.pkl"), "wb") as fd:
+        pickle.dump({"optimizer": optimizer_state(nlp, optimizer), "best_weights": best_weights}, fd)
+    with open(os.path.join(temporary, "state.json"), "w") as fd:
+        fd.write(json.dumps(state, indent=2))
 
+    previous = path + ".old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, previous)
+    os.rename(temporary, path)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def load_checkpoint(path: str):
+    """`(nlp, optimizer, state, best_weights)` of the checkpoint at `path`, or None."""
+    if not os.path.exists(os.path.join(path, "state.json")):
+        return None
+    nlp = spacy.load(os.path.join(path, "model"))
+    with open(os.path.join(path, "optimizer.pkl"), "rb") as fd:
+        saved = pickle.load(fd)
+    with open(os.path.join(path, "state.json")) as fd:
+        state = json.loads(fd.read())
+    return nlp, restore_optimizer(nlp, saved["optimizer"]), state, saved["best_weights"]
+
+
+def train(nlp, train_examples: list, dev_examples: list, max_epochs: int = 130, patience: int = 5,
+          dropout: float = 0.2, batch_start: float = 4.0, batch_stop: float = 32.0, batch_compound: float = 1.001,
+          seed: int = 0, checkpoint_dir: str = None, checkpoint_every: int = 1, resume: tuple = None):
+    """
+    Train the NER with compounding minibatches, scoring the held-out examples after every
+    epoch. Stops once the entity F-score did not improve for `patience` epochs and leaves
+    the best scoring weights in the pipeline.
+
+    With `checkpoint_dir` set, the pipeline, optimizer and progress are saved to
+    `checkpoint_dir/last` every `checkpoint_every` epochs, and the best scoring pipeline to
+    `checkpoint_dir/best`. `resume` is the `(optimizer, state, best_weights)` of a loaded
+    checkpoint to continue from.
+    """
     ner = nlp.get_pipe('ner')
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
 
     # add labels
-    for _, annotations in TRAIN_DATA:
-        for ent in annotations.get('entities'):
-            ner.add_label(ent[2])
+    for example in train_examples + dev_examples:
+        for ent in example.reference.ents:
+            ner.add_label(ent.label_)
+
+    state = {"epoch": -1, "best_score": -1.0, "best_epoch": None, "stale": 0}
+    best_weights = None
+    if resume is not None:
+        optimizer, saved_state, best_weights = resume
+        state.update(saved_state)
+        print("Resuming after epoch %d (best ents_f %.3f)" % (state["epoch"], state["best_score"]))
 
     # get names of other pipes to disable them during training
-    other_pipes = [pipe for pipe in nlp.pipe_names if pipe != 'ner']
-    with nlp.disable_pipes(*other_pipes):
-        optimizer = nlp.create_optimizer()
-        for itn in range(130):
-            print("Starting iteration " + str(itn))
-            random.shuffle(TRAIN_DATA)
+    with nlp.select_pipes(enable=['ner']):
+        if resume is None:
+            optimizer = nlp.create_optimizer()
+        for epoch in range(state["epoch"] + 1, max_epochs):
+            if patience and state["stale"] >= patience:
+                print("No improvement for %d epochs, stopping." % state["stale"])
+                break
+
+            # Seeded per epoch, so a resumed run sees the same batches it would have.
+            examples = list(train_examples)
+            random.Random(seed + epoch).shuffle(examples)
             losses = {}
-            for text, annotations in TRAIN_DATA:
-                doc = nlp.make_doc(text)
-                try:
-                    example = Example.from_dict(doc, annotations)
-                except Exception:
-                    continue
+            started = time.perf_counter()
+            batches = minibatch(examples, size=compounding(batch_start, batch_stop, batch_compound))
+            for batch in batches:
+                nlp.update(batch, drop=dropout, sgd=optimizer, losses=losses)
+            elapsed = time.perf_counter() - started
+
+            scores = nlp.evaluate(dev_examples) if dev_examples else {}
+            score = scores.get('ents_f') or 0.0
+            print("epoch %d  loss %.3f  ents_p %.3f  ents_r %.3f  ents_f %.3f  %.1f examples/sec" % (
+                epoch, losses.get('ner', 0.0), scores.get('ents_p') or 0.0, scores.get('ents_r') or 0.0, score,
+                len(examples) / elapsed if elapsed else 0.0))
+
+            state["epoch"] = epoch
+            improved = not dev_examples or score > state["best_score"]
+            if improved:
+                state.update(best_score=score, best_epoch=epoch, stale=0)
+                best_weights = ner.to_bytes()
+            else:
+                state["stale"] += 1
+
+            if checkpoint_dir:
+                if improved:
+                    save_pipeline(nlp, os.path.join(checkpoint_dir, "best"))
+                if (epoch + 1) % checkpoint_every == 0 or (patience and state["stale"] >= patience):
+                    save_checkpoint(nlp, os.path.join(checkpoint_dir, "last"), optimizer, state, best_weights)
+
+    if best_weights is not None:
+        ner.from_bytes(best_weights)
+    return state["best_score"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the resume NER on DocBin files.")
+    parser.add_argument("--data", default="train.json", help="JSON training data, converted once to DocBin.")
+    parser.add_argument("--train", default="train.spacy", help="DocBin file or directory of DocBin shards.")
+    parser.add_argument("--dev", default="dev.spacy", help="DocBin file or directory of DocBin shards.")
+    parser.add_argument("--eval-split", type=float, default=0.2,
+                        help="Held-out fraction used when converting --data.")
+    parser.add_argument("--model", default="model", help="Pipeline to continue training and where it is saved.")
+    parser.add_argument("--base", default="en_core_web_sm", help="Pipeline to start from without a --model.")
+    parser.add_argument("--max-epochs", type=int, default=130)
+    parser.add_argument("--patience", type=int, default=5, help="Epochs without improvement before stopping.")
+    parser.add_argument("--dropout", type=float, default=0.2)
+    parser.add_argument("--batch-start", type=float, default=4.0)
+    parser.add_argument("--batch-stop", type=float, default=32.0)
+    parser.add_argument("--batch-compound", type=float, default=1.001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint-dir", default="checkpoints",
+                        help="Where the last and best checkpoints are kept (empty to disable).")
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="Epochs between checkpoints.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint, if any.")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.train):
+        print(convert(args.data, args.train, dev_path=args.dev, eval_split=args.eval_split, seed=args.seed))
+
+    checkpoint = None
+    if args.resume and args.checkpoint_dir:
+        checkpoint = load_checkpoint(os.path.join(args.checkpoint_dir, "last"))
+
+    if checkpoint is not None:
+        nlp, resume = checkpoint[0], checkpoint[1:]
+    else:
+        resume = None
+        if not os.path.exists(os.path.join(args.model, "meta.json")):
+            nlp = spacy.load(args.base)
+        else:
+            nlp = spacy.load(args.model)
+
+    train_examples = load_examples(nlp, args.train)
+    dev_examples = load_examples(nlp, args.dev) if os.path.exists(args.dev) else []
 
-                nlp.update([example], drop=0.2, sgd=optimizer, losses=losses)
-            print(losses)
+    train(nlp, train_examples, dev_examples, max_epochs=args.max_epochs, patience=args.patience,
+          dropout=args.dropout, batch_start=args.batch_start, batch_stop=args.batch_stop,
+          batch_compound=args.batch_compound, seed=args.seed, checkpoint_dir=args.checkpoint_dir or None,
+          checkpoint_every=args.checkpoint_every, resume=resume)
 
-    nlp.to_disk("model")
+    nlp.to_disk(args.model)
 
     doc = nlp(test_string)
 
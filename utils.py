@@ -1,41 +1,32 @@
 import io
+import os
 import re
 import math
-import itertools
+import bisect
 import functools
-import pandas as pd
-import docx2txt
-import nltk
-from spacy.matcher import PhraseMatcher
-from pdfminer.converter import TextConverter
-from pdfminer.pdfinterp import PDFPageInterpreter
-from pdfminer.pdfinterp import PDFResourceManager
-from pdfminer.layout import LAParams
-from pdfminer.pdfpage import PDFPage
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from concurrent.futures import ProcessPoolExecutor
 
 from .resources import RESOURCES
+from .contact import MONTH, DATE_SEP, DATE_PATTERN, DATE_RANGE_PATTERN, DATE_RANGE_RE, scan
 
+# spaCy, NLTK, pdfminer and docx2txt are imported by the functions using them, so importing
+# the package (e.g. for the CLI, or for the regex extractors alone) stays cheap.
 
-STOPWORDS = set(stopwords.words('english'))
 
+@functools.lru_cache()
+def english_stopwords() -> frozenset:
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
 
-L2Norm = lambda x, x1, y, y1: math.sqrt(pow((x - x1), 2) + pow((y - y1), 2))
-
-MONTH = r'(' + RESOURCES['patterns']['MONTHS_SHORT'] + r'|' + RESOURCES['patterns']['MONTHS_LONG']\
-        + r'|0[1-9]|1[0-2]' + r')'
-
-DATE_SEP = r"[-/\s\S]{0,2}"
 
-DATE_PATTERN = r'(' + MONTH + DATE_SEP + RESOURCES['patterns']['YEAR'] \
-               + r'|' + RESOURCES['patterns']['YEAR'] + DATE_SEP + MONTH\
-               + r'|' + RESOURCES['patterns']['DAY'] + DATE_SEP + MONTH + DATE_SEP + RESOURCES['patterns']['YEAR'] \
-               + r'|' + MONTH + RESOURCES['patterns']['DAY'] + RESOURCES['patterns']['YEAR']\
-               + r'|' + RESOURCES["patterns"]['YEAR'] + r')'
+def __getattr__(name):
+    # `STOPWORDS` used to be read from the NLTK corpus at import time.
+    if name == "STOPWORDS":
+        return english_stopwords()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
-DATE_RANGE_PATTERN = r"(" + DATE_PATTERN + r"[-\s\S]{0,8}" + DATE_PATTERN + r"|" + DATE_PATTERN + r")"
+L2Norm = lambda x, x1, y, y1: math.sqrt(pow((x - x1), 2) + pow((y - y1), 2))
 
 
 def remove_special_chars(val: str):
@@ -45,55 +36,135 @@ def remove_special_chars(val: str):
         .replace("]", " ").replace("&", "").replace('"', "").replace("'", "")
 
 
-@functools.lru_cache()
-def make_case_insensitive(val: str,  disable_comp: bool=True) -> list:
-    vals = list()
-    vals.append(val)
-    vals.append(str(val).upper())
-    vals.append(str(val).lower())
-    vals.append(str(val).title())
-
-    lt = val.split(" ")
-
-    operations = ["LOWER", "TITLE"]
-
-    size = len(lt)
-    if not disable_comp and size > 1:
-        operations *= size
-        operations = list(itertools.combinations(operations, size))
-        for ops in operations:
-            values = []
-            for index, op in enumerate(ops):
-                _val = lt[index]
-                if op == "LOWER":
-                    values.append(str(_val).lower())
-                else:
-                    values.append(str(_val).title())
-
-            vals.append(" ".join(values))
-    return vals
-
-
-def extract_text_from_pdf(pdf_path):
+def normalize_text(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def load_terms(file_path, normalize=str.strip) -> list:
+    with open(file_path, "r") as fd:
+        terms = [normalize(str(line).strip()) for line in fd.readlines()]
+    return [term for term in terms if term]
+
+
+def _extract_pdf_pages(pdf_path, pagenos=None, max_pages: int = 0):
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfpage import PDFPage
+
+    # One resource manager and converter per document: fonts and resources parsed for a page
+    # are reused by the following ones, and the output buffer is rewound between pages.
+    resource_manager = PDFResourceManager(caching=True)
+    output = io.StringIO()
+    converter = TextConverter(resource_manager, output, laparams=LAParams())
+    page_interpreter = PDFPageInterpreter(resource_manager, converter)
+    try:
+        with open(pdf_path, 'rb') as fh:
+            for page in PDFPage.get_pages(fh,
+                                          pagenos=pagenos,
+                                          maxpages=max_pages or 0,
+                                          caching=True,
+                                          check_extractable=True):
+                page_interpreter.process_page(page)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+    finally:
+        converter.close()
+        output.close()
+
+
+def _extract_pdf_page_range(pdf_path, pagenos):
+    return list(_extract_pdf_pages(pdf_path, pagenos=set(pagenos)))
+
+
+def count_pdf_pages(pdf_path) -> int:
+    from pdfminer.pdfpage import PDFPage
+
     with open(pdf_path, 'rb') as fh:
-        for page in PDFPage.get_pages(fh, 
-                                      caching=True,
-                                      check_extractable=True):
-            resource_manager = PDFResourceManager()
-            fake_file_handle = io.StringIO()
-            converter = TextConverter(resource_manager, fake_file_handle, laparams=LAParams())
-            page_interpreter = PDFPageInterpreter(resource_manager, converter)
-            page_interpreter.process_page(page)
- 
-            text = fake_file_handle.getvalue()
-            yield text
- 
-            # close open handles
-            converter.close()
-            fake_file_handle.close()
+        return sum(1 for _ in PDFPage.get_pages(fh, caching=True, check_extractable=True))
+
+
+# `(pid, workers, executor)` of the page extraction pool, shared by every document of a process.
+_pdf_pool = None
+
+
+def pdf_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    The process pool extracting page ranges, started on first use and kept for the following
+    documents. A forked child starts its own rather than using the parent's.
+    """
+    global _pdf_pool
+    if _pdf_pool is None or _pdf_pool[:2] != (os.getpid(), workers):
+        if _pdf_pool is not None and _pdf_pool[0] == os.getpid():
+            _pdf_pool[2].shutdown(wait=False)
+        _pdf_pool = (os.getpid(), workers, ProcessPoolExecutor(max_workers=workers))
+    return _pdf_pool[2]
+
+
+def _extract_pdf_pages_parallel(pdf_path, page_count: int, workers: int, executor: ProcessPoolExecutor = None):
+    chunk_size = max(1, math.ceil(page_count / (workers * 2)))
+    chunks = [range(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+    executor = executor or pdf_executor(workers)
+    futures = [executor.submit(_extract_pdf_page_range, pdf_path, list(chunk)) for chunk in chunks]
+    try:
+        for future in futures:
+            for text in future.result():
+                yield text
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_text_from_pdf(pdf_path, max_pages: int = None, max_bytes: int = None, workers: int = None,
+                          executor: ProcessPoolExecutor = None):
+    """
+    Yield the text of each page in order. Extraction stops after `max_pages` pages, or once
+    `max_bytes` of text were produced, the last page being cut at that budget. Documents with
+    at least `parallel_min_pages` pages are split into page ranges extracted by `executor`,
+    by default a pool of `workers` processes shared by all documents (see `pdf_executor`).
+    """
+    config = RESOURCES['pdf']
+    max_pages = config['max_pages'] if max_pages is None else max_pages
+    max_bytes = config['max_bytes'] if max_bytes is None else max_bytes
+    workers = config['workers'] if workers is None else workers
+
+    pages = None
+    if executor is not None or (workers and workers > 1):
+        page_count = count_pdf_pages(pdf_path)
+        if max_pages:
+            page_count = min(page_count, max_pages)
+        if page_count >= config['parallel_min_pages']:
+            pages = _extract_pdf_pages_parallel(pdf_path, page_count, max(workers or 1, 1), executor)
+    if pages is None:
+        pages = _extract_pdf_pages(pdf_path, max_pages=max_pages)
+
+    size = 0
+    for text in pages:
+        if max_bytes:
+            encoded = text.encode('utf-8')
+            if size + len(encoded) >= max_bytes:
+                yield encoded[:max_bytes - size].decode('utf-8', 'ignore')
+                pages.close()
+                break
+            size += len(encoded)
+        yield text
+
+
+def join_pages(pages) -> str:
+    """Text of the `pages` joined by spaces, written out page by page as they are produced."""
+    buffer = io.StringIO()
+    for number, page in enumerate(pages):
+        if number:
+            buffer.write(" ")
+        buffer.write(page)
+    return buffer.getvalue()
 
 
 def extract_text_from_doc(doc_path):
+    import docx2txt
+
     temp = docx2txt.process(doc_path)
     text = [line.replace('\t', ' ') for line in temp.split('\n') if line]
     return ' '.join(text)
@@ -112,8 +183,12 @@ def extract_text_from_files(doc_path):
 
 
 def extract_entities_wih_custom_model(custom_doc):
+    from .pipeline import CUSTOM_ENTS_KEY
+
     entities = {}
-    for ent in custom_doc.ents:
+    # Single pass pipelines keep the custom entities apart from the base ones.
+    custom_ents = custom_doc.spans[CUSTOM_ENTS_KEY] if CUSTOM_ENTS_KEY in custom_doc.spans else custom_doc.ents
+    for ent in custom_ents:
         if ent.label_ not in entities.keys():
             entities[ent.label_] = [ent.text]
         else:
@@ -124,249 +199,172 @@ def extract_entities_wih_custom_model(custom_doc):
 
 
 def extract_mobile_number(text):
-    # phone_nums = re.findall(re.compile(r'(?:(?:\+?([1-9]|[0-9][0-9]|[0-9][0-9][0-9])\s*(?:[.-]\s*)?)?(?:\(\s*([2-9]1[02-9]|[2-9][02-8]1|[2-9][02-8][02-9])\s*\)|([0-9][1-9]|[0-9]1[02-9]|[2-9][02-8]1|[2-9][02-8][02-9]))\s*(?:[.-]\s*)?)?([2-9]1[02-9]|[2-9][02-9]1|[2-9][02-9]{2})\s*(?:[.-]\s*)?([0-9]{4})(?:\s*(?:#|x\.?|ext\.?|extension)\s*(\d+))?'), text)
-    mob_num_regex = r'''(\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4}|\(\d{3}\)
-                        [-\.\s]*\d{3}[-\.\s]??\d{4}|\d{3}[-\.\s]??\d{4})'''
-    phone_nums = re.findall(re.compile(mob_num_regex), text)
-    if phone_nums:
-        return ["".join(num) for num in phone_nums]
-    return phone_nums
+    return [match.text for match in scan(text) if match.kind == "phone"]
 
 
 def extract_email(text):
-    email = re.findall("([^@|\s]+@[^@]+\.[^@|\s]+)", text)
-    if email:
-        try:
-            return email[0].split()[0].strip(';')
-        except IndexError:
-            return None
+    for match in scan(text):
+        if match.kind == "email":
+            return match.text
+    return None
 
 
-def extract_skills(parser, span, noun_chunks):
+def extract_skills(parser, span, noun_chunks=None):
     skill_set = set()
-    matcher = PhraseMatcher(parser.nlp.vocab)
-
-    with open(RESOURCES['skills_file'], "r") as fd:
-        skills = fd.readlines()
-        skills = [remove_special_chars(str(skill).strip().lower()) for skill in skills if skill]
-
-        patterns = []
-        for skill in skills:
-            pattern = [parser.nlp.make_doc(token) for token in make_case_insensitive(skill)]
-            patterns.extend(pattern)
+    matcher = parser.engine.gazetteers["skills"]
 
-        matcher.add("MATCH_SKILLS", patterns)
-        matches = matcher(span)
-        for match_id, start, end in matches:
-            sub_span = parser.doc[start:end]
-            if sub_span:
-                skill_set.add(sub_span.text)
+    matches = matcher(span)
+    for match_id, start, end in matches:
+        sub_span = parser.doc[start:end]
+        if sub_span:
+            skill_set.add(sub_span.text)
 
     return [i for i in skill_set]
 
 
-def detect_resume_sections(parser) -> []:
-    from .parser import ResumeSection
-    resume_sections = RESOURCES['resume_sections']
-    sections = []
-    for section_name in resume_sections:
-        matcher = PhraseMatcher(parser.nlp.vocab)
-        patterns = []
-        for text in resume_sections[section_name]:
-            pattern = [parser.nlp.make_doc(token) for token in make_case_insensitive(text)]
-            patterns.extend(pattern)
-
-        matcher.add("resume-section-%s" % section_name, patterns)
-        matches = matcher(parser.doc)
-        for match_id, start, end in matches:
-            span = parser.doc[start:end]
-            if span:
-                s = ResumeSection(section_name=section_name, start_index=start, end_index=end)
-                sections.append(s)
-                break
-
-    return sections
-
-
-def _extract_education_date(parser, doc, start, end):
-    left_entries = []
-    right_entries = []
-
-    left_min_date = right_min_date = None
+def detect_resume_sections(parser):
+    return parser.engine.section_detector(parser.doc)
 
-    # Search Left
-    left_span = doc[:start]
-    left_doc = parser.nlp(left_span.text.strip().replace("\n", " "))
 
-    for ent in left_doc.to_json()['ents']:
-        if ent['label'] == 'DATE':
-            left_entries.append(ent)
+def _extract_education_date(doc, start, end, dates: list = None, window: int = None):
+    """
+    Closest DATE entity to the school at doc[start:end], looking at most `window` tokens
+    either side. `dates` are the DATE entities of `doc` in document order.
+    """
+    window = window if window is not None else RESOURCES['education_date_window']
+    if dates is None:
+        dates = [ent for ent in doc.ents if ent.label_ == "DATE"]
 
-    # search right
-    right_span = doc[end:]
-    right_doc = parser.nlp(right_span.text.strip().replace("\n", ""))
+    lower = max(0, start - window)
+    upper = min(len(doc), end + window)
 
-    for ent in right_doc.to_json()['ents']:
-        if ent['label'] == "DATE":
-            right_entries.append(ent)
-            
-    # import pdb; pdb.set_trace()
-
-    try:
-        left_min_date = min(left_entries, key=lambda x: L2Norm(start, x['start'], end, x['end']))
-    except Exception:
-        pass
-
-    try:
-        right_min_date = min(right_entries, key=lambda x: L2Norm(start, x['start'], end, x['end']))
-    except Exception:
-        pass
+    candidates = []
+    for ent in dates:
+        if ent.end <= lower:
+            continue
+        if ent.start >= upper:
+            break
+        if ent.end <= start or ent.start >= end:
+            candidates.append(ent)
 
-    if left_min_date is None and right_min_date is None:
+    if not candidates:
         return None
-    elif left_min_date is None:
-        return right_doc[right_min_date['start']:right_min_date['end']]  # right_min_date
-    elif right_min_date is None:
-        return left_doc[left_min_date['start']:left_min_date['end']]
+    return min(candidates, key=lambda x: L2Norm(start, x.start, end, x.end))
 
-    coord = min([right_min_date, left_min_date], key=lambda x: L2Norm(start, x['start'], end, x['end']))
 
-    _start = coord['start']
-    _end = coord['end']
+def _search_education_date(doc, start, end, window: int = None):
+    """Regex fallback over the same token window, preferring the nearest match on the left."""
+    window = window if window is not None else RESOURCES['education_date_window']
 
-    if _start == right_min_date['start'] and _end ==  right_min_date['end']:
-        return right_doc[_start:_end]
+    left_text = doc[max(0, start - window):start].text
+    dates = list(DATE_RANGE_RE.finditer(left_text))
+    if dates:
+        return dates[-1].group(0).strip().replace("\n", " ")
 
-    return left_doc[_start:_end]
+    right_text = doc[end:min(len(doc), end + window)].text
+    date = DATE_RANGE_RE.search(right_text)
+    if date:
+        return str(date.group(0)).strip().replace("\n", " ")
+    return None
 
 
-def _extract_course(parser, doc, end_index):
-    course_text = ""
-    matcher = PhraseMatcher(parser.nlp.vocab)
-    doc = parser.nlp(str(doc.text).strip().replace("\n", " "))
+def _match_courses(parser, doc) -> list:
+    from spacy.util import filter_spans
 
-    with open(RESOURCES["courses_file"], "r") as fd:
-        courses = fd.readlines()
-        courses = [str(course).strip() for course in courses if course]
+    matches = parser.engine.gazetteers["courses"](doc)
+    spans = filter_spans([doc[start:end] for _, start, end in matches])
+    return [(span.start, span.end) for span in spans]
 
-    patterns = []
-    for course in courses:
-        pattern = [parser.nlp.make_doc(token) for token in make_case_insensitive(course, disable_comp=False)]
-        patterns.extend(pattern)
 
-    matcher.add("MATCH_COURSES", patterns)
-    doc_span = parser.nlp(doc[end_index:].text)
-    matches = matcher(doc_span)
+def _extract_course(parser, doc, end_index, courses: list = None):
+    """
+    First course mentioned after `end_index`. `courses` are the sorted (start, end) course
+    matches of `doc`, computed once per education section.
+    """
+    if courses is None:
+        courses = _match_courses(parser, doc)
 
-    for match_id, start, end in matches:
-        span = doc_span[start:end]
-        if span:
-            course_text = span.text
-            break
-    return course_text
+    index = bisect.bisect_left(courses, (end_index,))
+    if index < len(courses):
+        start, end = courses[index]
+        return doc[start:end].text
+    return ""
 
 
-def extract_education(parser, text):
+def extract_education(parser, span):
     schools_set = []
-    matcher = PhraseMatcher(parser.nlp.vocab)
-    doc = parser.nlp(str(text).strip())
-
-    with open(RESOURCES["schools_file"], "r") as fd:
-        schools = fd.readlines()
-        schools = [str(school).strip() for school in schools if school]
-
-        patterns = []
-        for school in schools:
-            pattern = [parser.nlp.make_doc(token) for token in make_case_insensitive(school)]
-            patterns.extend(pattern)
-
-        matcher.add("MATCH_SCHOOLS", patterns)
-        matches = matcher(doc)
-        for match_id, start, end in matches:
-            span = doc[start:end]
-            if span:
-                school_dict = dict()
-                school_dict['name'] = span.text
-                school_dict['course'] = _extract_course(parser, doc, end)
-                date_entity_span = _extract_education_date(parser, doc, start, end)
-                if date_entity_span:
-                    school_dict['date'] = date_entity_span.text
-
-                if "date" not in school_dict:
-                    left_span = doc[:start]
-
-                    date = re.search(re.compile(DATE_RANGE_PATTERN), left_span.text.strip())
-                    if date:
-                        school_dict['date'] = date.group(0).strip().replace("\n", " ")
-                    else:
-                        right_span = doc[end:]
-                        date = re.search(re.compile(DATE_RANGE_PATTERN), right_span.text.strip())
-                        if date:
-                            school_dict['date'] = str(date.group(0)).strip().replace("\n", " ")
-                schools_set.append(school_dict)
+    matcher = parser.engine.gazetteers["schools"]
+    # The education span comes out of the already processed resume, so its DATE entities
+    # are reused instead of running the pipeline again.
+    doc = parser.nlp(str(span).strip()) if isinstance(span, str) else span.as_doc()
+    dates = [ent for ent in doc.ents if ent.label_ == "DATE"]
+    courses = _match_courses(parser, doc)
+
+    matches = matcher(doc)
+    for match_id, start, end in matches:
+        span = doc[start:end]
+        if span:
+            school_dict = dict()
+            school_dict['name'] = span.text
+            school_dict['course'] = _extract_course(parser, doc, end, courses=courses)
+            date_entity_span = _extract_education_date(doc, start, end, dates=dates)
+            if date_entity_span:
+                school_dict['date'] = date_entity_span.text
+            else:
+                date = _search_education_date(doc, start, end)
+                if date:
+                    school_dict['date'] = date
+            schools_set.append(school_dict)
 
     return schools_set
 
 
-def extract_experience_sentences(resume_text):
-    #  print(resume_text)
-    wordnet_lemmatizer = WordNetLemmatizer()
-    stop_words = set(stopwords.words('english'))
-
-    # word tokenization
-    word_tokens = nltk.word_tokenize(resume_text)
-
-    # remove stop words and lemmatize
-    filtered_sentence = [
-            w for w in word_tokens if w not
-            in stop_words and wordnet_lemmatizer.lemmatize(w)
-            not in stop_words
-        ]
-    sent = nltk.pos_tag(filtered_sentence)
-
-    # parse regex
-    cp = nltk.RegexpParser('P: {<NNP>+}')
-    cs = cp.parse(sent)
-
-    test = []
-
-    for vp in list(
-        cs.subtrees(filter=lambda x: x.label() == 'P')
-    ):
-        test.append(" ".join([
-            i[0] for i in vp.leaves()
-            if len(vp.leaves()) >= 2])
-        )
-
-    # Search the word 'experience' in the chunk and
-    # then print out the text after it
-    x = [
-        x[x.lower().index('experience') + 10:]
-        for i, x in enumerate(test)
-        if x and 'experience' in x.lower()
+def _proper_noun_chunks(tokens) -> list:
+    # Runs of NNP tokens, as an NLTK `P: {<NNP>+}` chunk grammar finds them once stop words are dropped.
+    chunks, chunk = [], []
+    for token in tokens:
+        if token.is_stop:
+            continue
+        if token.tag_ == "NNP":
+            chunk.append(token.text)
+        else:
+            if chunk:
+                chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def extract_experience(parser, span=None):
+    """
+    The text following "experience" in proper noun chunks of at least two words, read from
+    the tokens and tags of the processed resume. `span` is the experience section (the whole
+    Doc if not given).
+    """
+    tokens = parser.doc if span is None else span
+    if not tokens.doc.has_annotation("TAG"):
+        return []
+
+    chunks = [" ".join(chunk) for chunk in _proper_noun_chunks(tokens) if len(chunk) >= 2]
+    return [
+        chunk[chunk.lower().index('experience') + 10:]
+        for chunk in chunks
+        if 'experience' in chunk.lower()
     ]
-    return x
 
 
 def extract_opportunity_available(parser):
     opportunities_set = set()
-    matcher = PhraseMatcher(parser.nlp.vocab)
-
-    opportunities = [str(op).strip() for op in RESOURCES["available_opportunities"] if op]
-
-    patterns = []
-    for op in opportunities:
-        pattern = [parser.nlp.make_doc(token) for token in make_case_insensitive(op)]
-        patterns.extend(pattern)
+    matcher = parser.engine.gazetteers["opportunities"]
 
-    matcher.add("MATCH_AVAILABLE_OPPORTUNITIES", patterns)
     matches = matcher(parser.doc)
     for match_id, start, end in matches:
         span = parser.doc[start:end]
         if span:
             opportunities_set.add(span.text)
 
-    word_intercepts = opportunities_set & STOPWORDS
+    word_intercepts = opportunities_set & english_stopwords()
     for word in word_intercepts:
         opportunities_set.remove(word)
 
@@ -0,0 +1,46 @@
+import os
+import time
+import traceback
+
+# Engine of the current worker process, built once by `init_worker`.
+_engine = None
+
+
+def init_worker(engine_kwargs: dict = None):
+    global _engine
+    from .engine import ParserEngine
+    _engine = ParserEngine(**(engine_kwargs or {}))
+
+
+def get_engine():
+    if _engine is None:
+        init_worker()
+    return _engine
+
+
+def parse_to_dict(file_path: str, fields: list = None) -> dict:
+    return get_engine().parse(file_path, fields).to_dict()
+
+
+def error_record(error: Exception) -> dict:
+    return {
+        "type": type(error).__name__,
+        "message": str(error),
+        "traceback": traceback.format_exc(limit=5),
+    }
+
+
+def parse_file(file_path: str, fields: list = None) -> dict:
+    """
+    Parse `file_path` with the worker's engine and return a JSON-serializable record.
+    Failures are reported in the record instead of being raised, so one bad file does not
+    abort a batch.
+    """
+    started = time.perf_counter()
+    record = {"file": file_path, "pid": os.getpid()}
+    try:
+        record["result"] = get_engine().parse(file_path, fields).to_dict()
+    except Exception as e:
+        record["error"] = error_record(e)
+    record["seconds"] = round(time.perf_counter() - started, 6)
+    return record